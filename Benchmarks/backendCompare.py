@@ -0,0 +1,27 @@
+# developed by Michael Reilly github.com/mreilly13
+
+# times loading and preprocessing Data/Store on the NumPy and cupy backends and checks that
+# both give identical features and labels
+# run from the main folder of the project with: python -m Benchmarks.backendCompare [jobs]
+
+import sys
+import time
+import numpy as np
+from NNModel.blackBox import load_data
+
+if __name__=="__main__":
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    results = {}
+    print("backend  rows        seconds")
+    for backend in ("numpy", "cupy"):
+        try:
+            start = time.perf_counter()
+            results[backend] = load_data(backend, jobs)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            print(f"{backend:<8} {'-':<11} unavailable: {e}")
+            continue
+        print(f"{backend:<8} {len(results[backend][0]):<11} {elapsed:.3f}")
+    if len(results) == 2:
+        same = all(np.array_equal(a, b) for a, b in zip(results["numpy"], results["cupy"]))
+        print("identical outputs:", same)
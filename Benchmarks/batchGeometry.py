@@ -0,0 +1,39 @@
+# developed by Michael Reilly github.com/mreilly13
+
+# compares the pair geometry of many small cysteine sets computed one structure at a time
+# with the padded batches of Parser.parsePDB.pair_geometry_batch, as used by parse_many
+# run from the main folder of the project with: python -m Benchmarks.batchGeometry [structures]
+
+import sys
+import time
+import numpy as np
+import Parser.parsePDB as parsePDB
+
+def synthetic_sets(count, seed=0):
+    # N, CA, C coordinates of count structures of 2 to 80 cysteines, scattered so
+    # that about half the pairs are within DMAX
+    rng = np.random.default_rng(seed)
+    sets = []
+    for n in rng.integers(2, 81, count):
+        ca = rng.uniform(0, 30, (n, 1, 3))
+        sets.append((ca + rng.normal(0, 1.5, (n, 3, 3))).astype(np.float32))
+    return sets
+
+if __name__=="__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    sets = synthetic_sets(count)
+    idxs = [[('A', r) for r in range(len(xyz))] for xyz in sets]
+
+    start = time.perf_counter()
+    single = [parsePDB.pair_geometry(xyz, idx, []) for xyz, idx in zip(sets, idxs)]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = parsePDB.pair_geometry_batch([(xyz, idx, []) for xyz, idx in zip(sets, idxs)])
+    batched_time = time.perf_counter() - start
+
+    pairs = sum(len(data) for errc, data in single if errc == 0)
+    assert all(len(a[1]) == len(b[1]) for a, b in zip(single, batched))
+    print(f"{count} structures, {pairs} pairs")
+    print(f"one at a time  {single_time:.3f} s")
+    print(f"batched        {batched_time:.3f} s  {single_time / batched_time:.1f}x")
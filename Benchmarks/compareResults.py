@@ -0,0 +1,55 @@
+# developed by Michael Reilly github.com/mreilly13
+
+# times the vectorised _compare_results and util_helper against the old per-row loops,
+# checking that both give the same results
+# run from the main folder of the project with: python -m Benchmarks.compareResults
+
+import time
+import numpy as np
+from NNModel.Util.helper import _compare_results, util_helper
+
+sizes = [10000, 100000, 1000000]
+
+def old_compare_results(raw_predictions, y_test):
+    y_predicted = []
+    correct = 0
+    total = len(raw_predictions)
+    for i in range(len(raw_predictions)):
+        j = np.where(raw_predictions[i,:] == max(raw_predictions[i,:]))
+        x = [0., 0.]
+        x[j[0][0]] = 1.
+        if np.array_equal(y_test[i,:], x):
+            correct += 1
+        y_predicted.append(x)
+    y_predicted = np.array(y_predicted)
+    wrong = total - correct
+    return [y_predicted, y_test, correct, wrong, raw_predictions]
+
+def old_util_helper(y_pred, y_test):
+    new_y_test = []
+    for i in range(len(y_pred)):
+        if np.array_equal(y_test[i,:], np.array([1, 0])):
+            new_y_test.append(0)
+        if np.array_equal(y_test[i,:], np.array([0, 1])):
+            new_y_test.append(1)
+    return new_y_test
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+if __name__=="__main__":
+    rng = np.random.default_rng(0)
+    print("rows      function          old s     new s     speedup  same")
+    for n in sizes:
+        raw = rng.random((n, 2)).astype(np.float32)
+        raw /= raw.sum(axis=1, keepdims=True)
+        y_test = np.eye(2)[rng.integers(0, 2, n)]
+        old, old_time = timed(old_compare_results, raw, y_test)
+        new, new_time = timed(_compare_results, raw, y_test)
+        same = np.array_equal(old[0], new[0]) and old[2:4] == new[2:4]
+        print(f"{n:<9} {'_compare_results':<17} {old_time:<9.3f} {new_time:<9.4f} {old_time / new_time:<8.0f} {same}")
+        old, old_time = timed(old_util_helper, new[0], y_test)
+        new, new_time = timed(util_helper, new[0], y_test)
+        print(f"{n:<9} {'util_helper':<17} {old_time:<9.3f} {new_time:<9.4f} {old_time / new_time:<8.0f} {old == new}")
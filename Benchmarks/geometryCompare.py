@@ -0,0 +1,95 @@
+# developed by Michael Reilly github.com/mreilly13
+
+# checks that Parser.Util.npgeometry matches the torch Parser.Util.geometry on synthetic
+# structures, failing with an AssertionError if they find different pairs or features more
+# than tolerance apart, and compares their speed and the cost of importing each in a fresh
+# interpreter
+# run from the main folder of the project with: python -m Benchmarks.geometryCompare
+
+import sys
+import time
+import subprocess
+import numpy as np
+import Parser.parsePDB as parsePDB
+import Parser.Util.npgeometry as npgeometry
+import Parser.Util.geometry as geometry
+
+sizes = [10, 100, 1000, 3000]
+params = parsePDB.params
+# largest difference allowed between the features of the two modules, in angstroms and radians
+tolerance = 5e-3
+
+importer = """
+import time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+rss = [line.split()[1] for line in open("/proc/self/status") if line.startswith("VmRSS")][0]
+print(elapsed, int(rss) / 1024)
+"""
+
+def synthetic_xyz(nres, seed=0):
+    # N, CA, C coordinates of a random compact structure, with a few residues missing
+    rng = np.random.default_rng(seed)
+    ca = rng.uniform(0, 3 * nres**(1/3), (nres, 1, 3))
+    xyz = (ca + rng.normal(0, 1.5, (nres, 3, 3))).astype(np.float32)
+    xyz[rng.choice(nres, nres // 20, replace=False), 0] = np.nan
+    return xyz
+
+def max_difference(a, b):
+    # largest difference of the distances and, wrapped to [-pi, pi], of the angles
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    if a.size == 0:
+        return 0.0
+    angle = np.abs(np.angle(np.exp(1j * (a[...,1:] - b[...,1:]))))
+    return max(np.abs(a[...,0] - b[...,0]).max(), angle.max())
+
+def timed(fn, *fnargs):
+    start = time.perf_counter()
+    out = fn(*fnargs)
+    return out, time.perf_counter() - start
+
+def check(nres, name, same, difference):
+    assert same, f"{name} geometry of {nres} residues finds different pairs"
+    assert difference <= tolerance, f"{name} geometry of {nres} residues differs by {difference:.2e}"
+
+def compare(nres, name, xyz_np, xyz_torch, fn_np, fn_torch, *fnargs):
+    (b0, i0, j0, c0), t_np = timed(fn_np, xyz_np, params, *fnargs)
+    (b1, i1, j1, c1), t_torch = timed(fn_torch, xyz_torch, params, *fnargs)
+    same = np.array_equal(i0, np.asarray(i1)) and np.array_equal(j0, np.asarray(j1))
+    difference = max_difference(c0, c1)
+    print(f"{nres:<8} {name:<8} {len(i0):<9} {same!s:<6} {difference:<10.2e} {t_torch:<9.4f} {t_np:<9.4f}")
+    check(nres, name, same, difference)
+
+if __name__=="__main__":
+    print("module                  import s  RSS MB")
+    for module in ("Parser.Util.npgeometry", "Parser.Util.geometry"):
+        result = subprocess.run([sys.executable, "-c", importer.format(module=module)], capture_output=True, text=True)
+        seconds, rss = result.stdout.split()
+        print(f"{module:<23} {float(seconds):<9.3f} {float(rss):.0f}")
+    print()
+
+    print("residues path     pairs     same   max diff   torch s   numpy s")
+    for nres in sizes:
+        xyz = synthetic_xyz(nres)
+        xyz_np, mask = npgeometry.pad_xyz([xyz])
+        xyz_torch, mask = geometry.pad_xyz([xyz])
+        if nres <= 1000:
+            maps_np, t_np = timed(npgeometry.xyz_to_c6d, xyz_np, params)
+            maps_torch, t_torch = timed(geometry.xyz_to_c6d, xyz_torch, params)
+            maps_torch = maps_torch.numpy()
+            same = np.array_equal(maps_np[...,0] < 999, maps_torch[...,0] < 999)
+            contact = maps_np[...,0] < 999
+            difference = max_difference(maps_np[contact], maps_torch[contact])
+            print(f"{nres:<8} {'dense':<8} {int(contact.sum()) // 2:<9} {same!s:<6} {difference:<10.2e} {t_torch:<9.4f} {t_np:<9.4f}")
+            check(nres, "dense", same, difference)
+        compare(nres, "sparse", xyz_np, xyz_torch, npgeometry.xyz_to_c6d_sparse, geometry.xyz_to_c6d_sparse)
+        compare(nres, "tiled", xyz_np, xyz_torch, npgeometry.xyz_to_c6d_tiled, geometry.xyz_to_c6d_tiled, 2**22)
+
+    xyzs = [synthetic_xyz(n, seed) for seed, n in enumerate(np.random.default_rng(0).integers(2, 81, 500))]
+    pairs_np, t_np = timed(npgeometry.xyz_to_c6d_batch, xyzs, params)
+    pairs_torch, t_torch = timed(geometry.xyz_to_c6d_batch, xyzs, params)
+    same = all(np.array_equal(a[0], b[0]) and np.array_equal(a[1], b[1]) for a, b in zip(pairs_np, pairs_torch))
+    difference = max(max_difference(a[2], b[2]) for a, b in zip(pairs_np, pairs_torch))
+    print(f"{'500':<8} {'batch':<8} {sum(len(p[0]) for p in pairs_np):<9} {same!s:<6} {difference:<10.2e} {t_torch:<9.4f} {t_np:<9.4f}")
+    check(500, "batch", same, difference)
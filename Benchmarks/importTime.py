@@ -0,0 +1,49 @@
+# developed by Michael Reilly github.com/mreilly13
+
+# times the imports each dsbpredict stage needs, in fresh interpreters; each list is what
+# dsbpredict imports at startup or in that stage, so keep them in step with it
+# run from the main folder of the project with: python -m Benchmarks.importTime [repeats]
+
+import sys
+import subprocess
+import statistics
+
+stages = {
+    "startup": "import argparse, gzip, shutil, subprocess, collections, concurrent.futures, NNModel.server, Parser.Util.threads",
+    "unzip": "import gzip, shutil, time, zlib, Parser.Util.manifest",
+    "parse": "import Parser.parsePDB, Parser.Util.store, Parser.Util.manifest, concurrent.futures.process",
+    "evaluate (numpy model)": "import Parser.parsePDB, NNModel.blackBox, NNModel.launchModel, NNModel.Util.graphs",
+    "evaluate --no-plots": "import Parser.parsePDB, NNModel.blackBox, NNModel.launchModel",
+    "evaluate (keras model)": "import Parser.parsePDB, NNModel.blackBox, NNModel.launchModel, NNModel.Util.graphs; from tensorflow import keras",
+    # the auto backend tries cupy, falling back to numpy when it is missing or has no device
+    "train": "import NNModel.init, NNModel.Util.callbacks, NNModel.Util.graphs; from tensorflow import keras; from NNModel.Util.backend import get_backend; get_backend()",
+}
+
+timer = """
+import time
+start = time.perf_counter()
+{imports}
+print(time.perf_counter() - start)
+"""
+
+def time_imports(imports):
+    result = subprocess.run([sys.executable, "-c", timer.format(imports=imports)], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    return float(result.stdout), None
+
+if __name__=="__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print("stage                    median s  notes")
+    for stage, imports in stages.items():
+        times = []
+        error = None
+        for _ in range(repeats):
+            elapsed, error = time_imports(imports)
+            if error:
+                break
+            times.append(elapsed)
+        if error:
+            print(f"{stage:<24} {'-':<9} {error}")
+        else:
+            print(f"{stage:<24} {statistics.median(times):<9.3f}")
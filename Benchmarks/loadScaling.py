@@ -0,0 +1,56 @@
+# developed by Michael Reilly github.com/mreilly13
+
+# times reading a synthetic Data/Parsed directory of per-PDB .csv files into the store and
+# loading the store back, against the old np.append loop of load_data_cpu
+# run from the main folder of the project with: python -m Benchmarks.loadScaling [jobs]
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import Parser.Util.store as store
+
+sizes = [1000, 10000, 100000]
+old_max = 10000 # the old loop is quadratic, so it is only run on the smaller sizes
+rows = 6 # cysteine pairs per synthetic PDB
+
+def synthetic_parsed(directory, count):
+    rng = np.random.default_rng(0)
+    for n in range(count):
+        with open(os.path.join(directory, f"pdb{n:06d}.csv"), "w") as f:
+            for dist, omega, theta, phi in rng.random((rows, 4)):
+                f.write(f"{dist * 20:f},{omega:f},{theta:f},{phi:f},0,A,{n % 500},B,{n % 700}\n")
+
+def old_load(directory):
+    parsed = sorted(os.listdir(directory))
+    data = np.zeros((1, 9))
+    for i in parsed:
+        pdb_data = np.genfromtxt(os.path.join(directory, i), delimiter=",")
+        if pdb_data.shape == (9,):
+            pdb_data = np.array([pdb_data])
+        data = np.append(data, pdb_data, axis=0)
+    return data[1:]
+
+if __name__=="__main__":
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    print("files     convert s  load s   us/file  old loop s")
+    for count in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_dir = os.path.join(tmp, "Parsed")
+            store_dir = os.path.join(tmp, "Store")
+            os.makedirs(csv_dir)
+            synthetic_parsed(csv_dir, count)
+            start = time.perf_counter()
+            store.convert_csv_dir(csv_dir, store_dir, jobs=jobs)
+            convert = time.perf_counter() - start
+            start = time.perf_counter()
+            data = store.load_store(store_dir, jobs)
+            load = time.perf_counter() - start
+            assert len(data) == count * rows
+            old = "-"
+            if count <= old_max:
+                start = time.perf_counter()
+                old_load(csv_dir)
+                old = f"{time.perf_counter() - start:.3f}"
+            print(f"{count:<9} {convert:<10.3f} {load:<8.3f} {(convert + load) / count * 1e6:<8.1f} {old}")
@@ -0,0 +1,43 @@
+# developed by Michael Reilly github.com/mreilly13
+
+# times Parser.Util.parser.parse_pdb_lines on synthetic structures of increasing size,
+# reading every residue and, as parsing for training does, only the cysteine backbones
+# run from the main folder of the project with: python -m Benchmarks.parseScaling
+
+import time
+import string
+import Parser.Util.parser as parser
+import Parser.parsePDB as parsePDB
+
+sizes = [1000, 10000, 100000]
+chains = string.ascii_uppercase + string.ascii_lowercase + string.digits
+chain_len = 5000
+
+def synthetic_pdb(nres):
+    # poly-ALA chains of at most chain_len residues, 5 heavy atoms per residue,
+    # with every 50th residue a cysteine, about the proportion in the PDB
+    lines = []
+    serial = 1
+    for r in range(nres):
+        chain = chains[r // chain_len]
+        resi = r % chain_len + 1
+        name = "CYS" if r % 50 == 0 else "ALA"
+        for atom in (" N  ", " CA ", " C  ", " O  ", " CB "):
+            x, y, z = (r % 97) * 1.5, (r // 97 % 97) * 1.5, (r // 9409) * 1.5
+            lines.append(f"ATOM  {serial % 100000:5d} {atom} {name} {chain}{resi:4d}    {x:8.3f}{y:8.3f}{z:8.3f}  1.00  0.00           {atom.strip()[0]}\n")
+            serial += 1
+    return lines
+
+if __name__=="__main__":
+    print("residues  atoms    seconds  us/atom  cys only s  us/atom")
+    for nres in sizes:
+        lines = synthetic_pdb(nres)
+        start = time.perf_counter()
+        pdb = parser.parse_pdb_lines(lines)
+        elapsed = time.perf_counter() - start
+        assert pdb != [] and pdb['xyz'].shape[0] == nres
+        start = time.perf_counter()
+        cys = parser.parse_pdb_lines(lines, **parsePDB.selection())
+        selective = time.perf_counter() - start
+        assert cys != [] and cys['xyz'].shape[0] == (nres + 49) // 50
+        print(f"{nres:<9} {len(lines):<8} {elapsed:<8.3f} {elapsed / len(lines) * 1e6:<8.2f} {selective:<11.3f} {selective / len(lines) * 1e6:.2f}")
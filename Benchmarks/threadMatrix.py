@@ -0,0 +1,115 @@
+# developed by Michael Reilly github.com/mreilly13
+
+# parse and evaluation throughput for a matrix of worker processes x threads per worker,
+# each cell run in a fresh interpreter so the thread limits apply before any library loads;
+# evaluation runs as dsbpredict -e --batch does, parsing in a launchModel.parse_pool of the
+# cell's size and running a saved or exported model with eval threads in the main process
+# run from the main folder of the project with:
+# python -m Benchmarks.threadMatrix [numpy|torch] [files] [model] [eval threads]
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import numpy as np
+
+workers = [1, 2, 4, 8, 16]
+threads = [1, 2, 4]
+# proteins per evaluate_many call, as -e --batch
+batch = 32
+
+def synthetic_files(directory, count, nres=300, seed=0):
+    # gzipped PDB files of random walk chains, every 10th residue a cysteine bonded to the next
+    import gzip
+    rng = np.random.default_rng(seed)
+    paths = []
+    for k in range(count):
+        ca = np.cumsum(rng.normal(0, 2.2, (nres, 3)), axis=0)
+        lines = []
+        cys = list(range(0, nres, 10))
+        for a, b in zip(cys[::2], cys[1::2]):
+            lines.append(f"SSBOND   1 CYS A {a+1:4d}    CYS A {b+1:4d}\n")
+        serial = 1
+        for r in range(nres):
+            name = "CYS" if r in cys else "ALA"
+            for atom, offset in ((" N  ", (-1.2, 0.6, 0)), (" CA ", (0, 0, 0)), (" C  ", (1.2, 0.6, 0)), (" O  ", (1.4, 1.8, 0)), (" CB ", (0, -0.8, 1.2))):
+                x, y, z = ca[r] + offset
+                lines.append(f"ATOM  {serial:5d} {atom} {name} A{r+1:4d}    {x:8.3f}{y:8.3f}{z:8.3f}  1.00  0.00           {atom.strip()[0]}\n")
+                serial += 1
+        path = os.path.join(directory, f"pdb{k:04d}.ent.gz")
+        with gzip.open(path, "wt") as f:
+            f.writelines(lines)
+        paths.append(path)
+    return paths
+
+def parse_cell(n_workers, n_threads, geometry, directory):
+    from concurrent.futures import ProcessPoolExecutor
+    import Parser.parsePDB as parsePDB
+    from Parser.Util.threads import set_threads
+    set_threads(n_threads)
+    paths = sorted(os.path.join(directory, f) for f in os.listdir(directory))
+    batches = [paths[k:k + 16] for k in range(0, len(paths), 16)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(n_workers, initializer=parsePDB.init_worker, initargs=(n_threads, geometry)) as pool:
+        list(pool.map(parsePDB.parse_many, batches))
+    return len(paths) / (time.perf_counter() - start)
+
+def evaluate_cell(n_workers, n_threads, geometry, directory, model, eval_threads):
+    # evaluated pairs per second, with the parse workers started and the model loaded first
+    import Parser.parsePDB as parsePDB
+    from Parser.Util.threads import set_threads
+    from NNModel.blackBox import load_model
+    from NNModel.launchModel import evaluate_many, parse_pool
+    parsePDB.set_geometry(geometry)
+    pool = parse_pool(n_workers, n_threads)
+    set_threads(eval_threads)
+    NNModel = load_model(model)
+    paths = sorted(os.path.join(directory, f) for f in os.listdir(directory))
+    requests = [{'name': os.path.basename(path), 'path': path, 'all_residues': False, 'plot': False} for path in paths]
+    pairs = 0
+    start = time.perf_counter()
+    for k in range(0, len(requests), batch):
+        for response in evaluate_many(requests[k:k + batch], NNModel, pool=pool, plot=False):
+            pairs += len(response.get('pairs', []))
+    elapsed = time.perf_counter() - start
+    if pool:
+        pool.shutdown()
+    return pairs / elapsed
+
+def run_cell(*cell):
+    # the result is the last line printed, after anything the libraries print
+    result = subprocess.run([sys.executable, "-m", "Benchmarks.threadMatrix", "--cell", *map(str, cell)], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.split()[-1])
+
+if __name__=="__main__":
+    if sys.argv[1:2] == ["--cell"]:
+        stage, n_workers, n_threads = sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+        if stage == "parse":
+            print(parse_cell(n_workers, n_threads, sys.argv[5], sys.argv[6]))
+        else:
+            eval_threads = int(sys.argv[8]) or None
+            print(evaluate_cell(n_workers, n_threads, sys.argv[5], sys.argv[6], sys.argv[7], eval_threads))
+        exit(0)
+
+    geometry = sys.argv[1] if len(sys.argv) > 1 else "numpy"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    model = sys.argv[3] if len(sys.argv) > 3 else "YBYF_Model_1_large"
+    # as --eval-threads, 0 leaves the library defaults of one thread per core
+    eval_threads = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as directory:
+        files = os.path.join(directory, "pdb")
+        os.makedirs(files)
+        synthetic_files(files, count)
+        print(f"{cores} cores, {count} files parsed with {geometry}, evaluated by {model} with {eval_threads or 'default'} eval threads")
+        print("workers  threads  parse files/s  evaluate pairs/s  oversubscribed")
+        for n_workers in workers:
+            for n_threads in threads:
+                parse = run_cell("parse", n_workers, n_threads, geometry, files)
+                evaluate = run_cell("evaluate", n_workers, n_threads, geometry, files, model, eval_threads)
+                parse = f"{parse:.1f}" if parse else "failed"
+                evaluate = f"{evaluate:.0f}" if evaluate else "failed"
+                print(f"{n_workers:<8} {n_threads:<8} {parse:<14} {evaluate:<17} {'yes' if n_workers * n_threads > cores else ''}")
@@ -0,0 +1,31 @@
+# Files in the NNModel Package developed by Francisco Benavides github.com/1aidea
+
+import numpy as np
+
+"""
+
+    Array Backends
+
+    Data preprocessing runs on NumPy or, with a CUDA device, on cupy.
+    Both expose the same array functions, so code takes the module as xp.
+
+"""
+
+def get_backend(name="auto"):
+    # array module for the named backend; auto picks cupy when a CUDA device is available
+    if name == "numpy":
+        return np
+    try:
+        import cupy as cp
+        cp.cuda.runtime.getDeviceCount()
+        return cp
+    except Exception:
+        if name == "cupy":
+            raise
+        return np
+
+def to_host(xp, array):
+    # copy an array of the backend into host memory
+    if xp is np:
+        return array
+    return xp.asnumpy(array)
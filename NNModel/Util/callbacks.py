@@ -0,0 +1,34 @@
+# Files in the NNModel Package developed by Francisco Benavides github.com/1aidea
+
+from tensorflow import keras
+
+"""
+
+    Training Callbacks
+
+"""
+
+class LossAndErrorPrintingCallback(keras.callbacks.Callback):
+    def __init__(self):
+       self.training_batch_log = [[],[]]
+       self.testing_batch_log = [[],[]]
+
+    def returnTraining(self):
+        return self.training_batch_log
+    
+    def returnTesting(self):
+        return self.testing_batch_log
+
+    def on_train_batch_end(self, batch, logs=None):
+        #print(
+        #    "Up to batch {}, the average accuracy is {:7.2f}, the average loss is {:7.2f}.".format(batch, logs["accuracy"], logs["loss"])
+        #)
+        self.training_batch_log[0].append(logs["accuracy"])
+        self.training_batch_log[1].append(logs["loss"])
+
+    def on_test_batch_end(self, batch, logs=None):
+        #print(
+        #    "Up to batch {}, the average accuracy is {:7.2f}, the average loss is {:7.2f}.".format(batch, logs["accuracy"], logs["loss"])
+        #)
+        self.testing_batch_log[0].append(logs["accuracy"])
+        self.testing_batch_log[1].append(logs["loss"])
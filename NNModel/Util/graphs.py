@@ -1,8 +1,12 @@
 # Files in the NNModel Package developed by Francisco Benavides github.com/1aidea
 
+import matplotlib
+matplotlib.use("Agg") # graphs are only saved to files
 import seaborn
 from sklearn import metrics
 import matplotlib.pyplot as plt
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from .helper import util_helper
 import numpy as np
 import pandas as pd
@@ -107,9 +111,38 @@ def roc_graph(prediction_info, extra=""):
 
 def plot_data(data, name):
     pdb_chart = pd.DataFrame(data, columns=['dist', 'omega', 'theta', 'phi'])
-    seaborn.pairplot(pdb_chart)
+    grid = seaborn.pairplot(pdb_chart)
     cwd = make_path()
     plt.savefig(cwd + graph_fp + name + ".png")
+    plt.close(grid.fig)
+
+class PlotPool:
+    # render plot_data graphs in background processes, with at most 4 per worker waiting;
+    # the workers are started here, so create the pool before loading the model and forked
+    # workers do not copy it
+    def __init__(self, workers=1):
+        self.pool = ProcessPoolExecutor(workers)
+        self.pool.submit(int).result()
+        self.limit = 4 * workers
+        self.pending = deque()
+
+    def __call__(self, data, name):
+        self.pending.append((name, self.pool.submit(plot_data, data, name)))
+        while self.pending and (self.pending[0][1].done() or len(self.pending) > self.limit):
+            self.finish()
+
+    def finish(self):
+        # a failed graph is reported, but does not stop the evaluation it belongs to
+        name, job = self.pending.popleft()
+        try:
+            job.result()
+        except Exception as e:
+            print(name, "graph failed:", repr(e))
+
+    def close(self):
+        while self.pending:
+            self.finish()
+        self.pool.shutdown()
     
 def make_path():
     cwd = os.getcwd()
@@ -1,8 +1,6 @@
 # Files in the NNModel Package developed by Francisco Benavides github.com/1aidea
 
 import numpy as np
-from tensorflow import keras
-from sklearn.model_selection import train_test_split
 
 """
 
@@ -12,38 +10,29 @@ from sklearn.model_selection import train_test_split
 
 # helper function used to generate ROC curve and check accuracy.
 def _compare_results(raw_predictions, y_test):
-    y_predicted = []
-
-    correct = 0
     total = len(raw_predictions)
 
-    for i in range(len(raw_predictions)):
-        j = np.where(raw_predictions[i,:] == max(raw_predictions[i,:]))
-        #x = [0., 0., 0.] #np.zeros(3)
-        x = [0., 0.]
-        x[j[0][0]] = 1.
-        if np.array_equal(y_test[i,:], x):
-            correct += 1
-        y_predicted.append(x)
-    y_predicted = np.array(y_predicted)
+    # one-hot vector of the most likely class of each row, first class on ties
+    y_predicted = np.eye(2)[np.argmax(raw_predictions, axis=1)]
+
+    y_test_rows = np.asarray(y_test)[:total]
+    if y_test_rows.ndim == 2 and y_test_rows.shape[1] == 2:
+        correct = int(np.count_nonzero(np.all(y_test_rows == y_predicted, axis=1)))
+    else:
+        correct = 0
     
     wrong = total - correct
 
     return [y_predicted, y_test, correct, wrong, raw_predictions]
 
 def util_helper(y_pred, y_test):
-    new_y_test = []
-
-    for i in range(len(y_pred)):
-        #if np.array_equal(y_test[i,:], np.array([1, 0, 0])):
-        if np.array_equal(y_test[i,:], np.array([1, 0])):
-            new_y_test.append(0)
-            
-        #if np.array_equal(y_test[i,:], np.array([0, 1, 0])):
-        if np.array_equal(y_test[i,:], np.array([0, 1])):
-            new_y_test.append(1)
-
-    return new_y_test
+    # class of each row of y_test that is exactly [1, 0] or [0, 1], for the first len(y_pred) rows
+    y_test_rows = np.asarray(y_test)[:len(y_pred)]
+    if y_test_rows.ndim != 2 or y_test_rows.shape[1] != 2:
+        return []
+    class0 = (y_test_rows[:, 0] == 1) & (y_test_rows[:, 1] == 0)
+    class1 = (y_test_rows[:, 0] == 0) & (y_test_rows[:, 1] == 1)
+    return class1[class0 | class1].astype(int).tolist()
 
 # normalize the dataset 
 # X = (x[i] - mean) / standard_diviation
@@ -65,6 +54,7 @@ def feature_scaling(dataset):
 # 10% testing, 18% validation, and 72% training
 def dataset_split(data, labels):
     # split the data into train, validation, and test
+    from sklearn.model_selection import train_test_split
     x_train, x_test, y_train, y_test = train_test_split(data, labels, train_size=0.9, test_size=0.1, shuffle=True)
     x_train, x_validate, y_train, y_validate = train_test_split(x_train, y_train, train_size=0.8, test_size=0.2, shuffle=True)
 
@@ -77,28 +67,3 @@ def fix_vectors(y_vector):
     if cmpr.all() == y_vector.all():
         y_vector = np.append(y_vector, np.zeros((h, w)), axis=1)
     return y_vector
-
-class LossAndErrorPrintingCallback(keras.callbacks.Callback):
-    def __init__(self):
-       self.training_batch_log = [[],[]]
-       self.testing_batch_log = [[],[]]
-
-    def returnTraining(self):
-        return self.training_batch_log
-    
-    def returnTesting(self):
-        return self.testing_batch_log
-
-    def on_train_batch_end(self, batch, logs=None):
-        #print(
-        #    "Up to batch {}, the average accuracy is {:7.2f}, the average loss is {:7.2f}.".format(batch, logs["accuracy"], logs["loss"])
-        #)
-        self.training_batch_log[0].append(logs["accuracy"])
-        self.training_batch_log[1].append(logs["loss"])
-
-    def on_test_batch_end(self, batch, logs=None):
-        #print(
-        #    "Up to batch {}, the average accuracy is {:7.2f}, the average loss is {:7.2f}.".format(batch, logs["accuracy"], logs["loss"])
-        #)
-        self.testing_batch_log[0].append(logs["accuracy"])
-        self.testing_batch_log[1].append(logs["loss"])
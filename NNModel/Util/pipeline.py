@@ -0,0 +1,72 @@
+# Files in the NNModel Package developed by Francisco Benavides github.com/1aidea
+
+import os
+import numpy as np
+import tensorflow as tf
+import Parser.Util.store as store
+
+"""
+
+    Streaming Input Pipeline
+
+    Rows are read from the store shards a chunk at a time and assigned to the
+    training, validation or test split by a draw seeded per shard, so each split
+    sees the same rows on every pass without holding the data in memory.
+
+"""
+
+# 72% training, 18% validation, and 10% testing, as in dataset_split
+splits = {"train": (0.0, 0.72), "validate": (0.72, 0.9), "test": (0.9, 1.0)}
+scale = np.array([20.0, np.pi, np.pi, np.pi], dtype=np.float32)
+
+def _shard_slices(directory):
+    # shard -> sorted (offset, count) of the current rows of every PDB in the store
+    slices = {}
+    for shard, offset, count, parsed in store.read_index(directory).values():
+        slices.setdefault(shard, []).append((offset, count))
+    return {shard: sorted(slices[shard]) for shard in sorted(slices)}
+
+def _split_mask(shard, length, split, seed):
+    # rows of a shard that belong to the split
+    number = int(shard[len(store.shard_prefix):-len(store.shard_ext)])
+    draw = np.random.default_rng([seed, number]).random(length)
+    low, high = splits[split]
+    return (draw >= low) & (draw < high)
+
+def store_chunks(directory, split, seed=0, chunk_rows=65536):
+    # yield (features, labels) of one split, chunk_rows at a time
+    for shard, slices in _shard_slices(directory).items():
+        data = np.load(os.path.join(directory, shard), mmap_mode='r')
+        mask = _split_mask(shard, len(data), split, seed)
+        for offset, count in slices:
+            for start in range(offset, offset + count, chunk_rows):
+                stop = min(start + chunk_rows, offset + count)
+                rows = data[start:stop][mask[start:stop]]
+                if len(rows) == 0:
+                    continue
+                features = np.stack([rows['dist'], rows['omega'], rows['theta'], rows['phi']], axis=1).astype(np.float32)
+                yield features, rows['ssbond'].astype(np.int32)
+
+def split_rows(directory, split, seed=0):
+    # number of rows in one split
+    total = 0
+    for shard, slices in _shard_slices(directory).items():
+        length = len(np.load(os.path.join(directory, shard), mmap_mode='r'))
+        mask = _split_mask(shard, length, split, seed)
+        total += sum(int(np.count_nonzero(mask[offset:offset + count])) for offset, count in slices)
+    return total
+
+def _normalize(features, labels):
+    return features / scale, tf.one_hot(labels, 2)
+
+def make_dataset(directory, split, batch_size, shuffle_buffer=0, seed=0):
+    # batched, prefetched dataset of normalized features and label vectors for one split
+    data = tf.data.Dataset.from_generator(
+        lambda: store_chunks(directory, split, seed),
+        output_signature=(tf.TensorSpec(shape=(None, 4), dtype=tf.float32), tf.TensorSpec(shape=(None,), dtype=tf.int32)))
+    data = data.unbatch()
+    if shuffle_buffer:
+        data = data.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    data = data.batch(batch_size)
+    data = data.map(_normalize, num_parallel_calls=tf.data.AUTOTUNE)
+    return data.prefetch(tf.data.AUTOTUNE)
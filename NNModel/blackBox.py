@@ -2,59 +2,40 @@
 
 import os
 import numpy as np
-import cupy as cp
-from tensorflow import keras
-from tensorflow.keras import utils
-from tensorflow.keras.layers import BatchNormalization, Dense, Dropout
-from tensorflow.keras.models import Sequential
-from NNModel.Util.helper import LossAndErrorPrintingCallback, _compare_results, fix_vectors
-from NNModel.Util.graphs import parameter_tuning, confusion_matrix, roc_graph
-
-def load_data_gpu():
-    # load preparsed data - GPU accelerated version
+from NNModel.Util.helper import _compare_results, fix_vectors
+from NNModel.Util.backend import get_backend, to_host
+from NNModel.numpyModel import NumpyModel, export_model
+import Parser.Util.store as store
+
+# TensorFlow and the graphing libraries take seconds to import, and cupy needs a CUDA device,
+# so they are imported by the functions that use them, keeping evaluation with NumPy models light
+
+def load_data(backend="auto", jobs=1):
+    # load preparsed data, preprocessing on the NumPy or cupy backend
+    xp = get_backend(backend)
     cwd = os.getcwd()
-    parsed_fp = "/Data/Parsed/"
-    parsed = os.listdir(cwd + parsed_fp)
-    parsed.sort()
-    data = cp.zeros((1, 9))
-    for i in parsed:
-        pdb_data = cp.genfromtxt(cwd + parsed_fp + i, delimiter=",")
-        if pdb_data.shape == (9,):
-            pdb_data = cp.array([pdb_data])
-        data = cp.append(data,pdb_data,axis=0)
-    data = data[1:]
+    store_fp = "/Data/Store/"
+    data = store.load_store(cwd + store_fp, jobs)
+    if len(data) == 0:
+        raise ValueError(f"the store in {cwd + store_fp} is empty; parse the PDB with -p first")
+    data = xp.asarray(np.stack([data['dist'], data['omega'], data['theta'], data['phi'], data['ssbond']], axis=1).astype(np.float64))
     
     # preprocessing
-    features = cp.copy(data[:, 0:4])
+    features = xp.copy(data[:, 0:4])
     features[:, 0] = features[:, 0] / 20.0
-    features[:, 1] = features[:, 1] / cp.pi
-    features[:, 2] = features[:, 2] / cp.pi
-    features[:, 3] = features[:, 3] / cp.pi
-    labels = cp.copy(data[:, 4])
-    return [features.get(), labels.get()]
+    features[:, 1] = features[:, 1] / xp.pi
+    features[:, 2] = features[:, 2] / xp.pi
+    features[:, 3] = features[:, 3] / xp.pi
+    labels = xp.copy(data[:, 4])
+    return [to_host(xp, features), to_host(xp, labels)]
 
-def load_data_cpu():
+def load_data_gpu(jobs=1):
+    # load preparsed data - GPU accelerated version
+    return load_data("cupy", jobs)
+
+def load_data_cpu(jobs=1):
     # load preparsed data - CPU version
-    cwd = os.getcwd()
-    parsed_fp = "/Data/Parsed/"
-    parsed = os.listdir(cwd + parsed_fp)
-    parsed.sort()
-    data = np.zeros((1, 9))
-    for i in parsed:
-        pdb_data = np.genfromtxt(cwd + parsed_fp + i, delimiter=",")
-        if pdb_data.shape == (9,):
-            pdb_data = np.array([pdb_data])
-        data = np.append(data,pdb_data,axis=0)
-    data = data[1:]
-    
-    # preprocessing
-    features = np.copy(data[:, 0:4])
-    features[:, 0] = features[:, 0] / 20.0
-    features[:, 1] = features[:, 1] / np.pi
-    features[:, 2] = features[:, 2] / np.pi
-    features[:, 3] = features[:, 3] / np.pi
-    labels = np.copy(data[:, 4])
-    return [features, labels]
+    return load_data("numpy", jobs)
 
 def load_single_data(data):
     # preprocess individual file data
@@ -66,49 +47,27 @@ def load_single_data(data):
     labels = np.copy(data[:, 4:])
     return [features, labels]
 
-def load_ss_data():
+def load_ss_data(jobs=1, backend="auto", seed=0):
     # sort loaded data into training and noise sets
-    data = load_data_gpu()
+    # the noise set is a seeded random sample of the pairs without disulfide bonds
+    data = load_data(backend, jobs)
     features = data[0]
     labels = data[1]
-    ss_features = []
-    non_ss_features = []
-    for i in range(len(features)):
-        if labels[i] == 1:
-            ss_features.append(features[i])
-        else:
-            non_ss_features.append(features[i])
-    ss_features = np.array(ss_features)
-    ss_labels = np.ones((len(ss_features)))
-    non_ss_features = np.array(non_ss_features)
-    non_ss_labels = np.zeros((len(non_ss_features)))
+    ss_rows = np.flatnonzero(labels == 1)
+    non_ss_rows = np.flatnonzero(labels != 1)
     noise_ratio = .02
-    noise = int(len(non_ss_features) * noise_ratio)
-    noise_features = non_ss_features[:noise, :]
-    noise_labels = non_ss_labels[:noise]
-    features = np.append(ss_features, noise_features, axis= 0)
-    labels = np.append(ss_labels, noise_labels, axis= 0)
+    noise = int(len(non_ss_rows) * noise_ratio)
+    rng = np.random.default_rng(seed)
+    noise_rows = np.sort(rng.choice(non_ss_rows, noise, replace=False))
+    features = features[np.concatenate([ss_rows, noise_rows])]
+    labels = np.concatenate([np.ones(len(ss_rows)), np.zeros(noise)])
     return [features, labels]
 
-def neural_network(data, batchNormalize=True, learning_rate=0.00001, batch_training=False, activation_function='ReLU'):
-    # load the data in
-    x_train = data[0]
-    x_validate = data[1]
-    x_test = data[2]
-    y_train = data[3]
-    y_validate = data[4]
-    y_test = data[5]
-    
-    # Hyperparameters
-    num_epochs = 20
-    batch_size = 75
-    if batch_training:
-        num_epochs = 1
-        batch_size = 1
-    eta = learning_rate
-    decay_factor = 0.95
-    size_hidden = 300
-    
+def build_model(batchNormalize=True, activation_function='ReLU', size_hidden=300):
+    from tensorflow import keras
+    from tensorflow.keras.layers import BatchNormalization, Dense, Dropout
+    from tensorflow.keras.models import Sequential
+
     # static parameters
     size_input = 4 # number of features
     size_output =  2 # number of labels
@@ -136,6 +95,34 @@ def neural_network(data, batchNormalize=True, learning_rate=0.00001, batch_train
     model = Sequential(_model)
     model.summary()
     
+    return model
+
+def neural_network(data, batchNormalize=True, learning_rate=0.00001, batch_training=False, activation_function='ReLU'):
+    from tensorflow import keras
+    from NNModel.Util.callbacks import LossAndErrorPrintingCallback
+    from NNModel.Util.graphs import parameter_tuning, confusion_matrix, roc_graph
+
+    # load the data in
+    x_train = data[0]
+    x_validate = data[1]
+    x_test = data[2]
+    y_train = data[3]
+    y_validate = data[4]
+    y_test = data[5]
+    
+    # Hyperparameters
+    num_epochs = 20
+    batch_size = 75
+    if batch_training:
+        num_epochs = 1
+        batch_size = 1
+    eta = learning_rate
+    decay_factor = 0.95
+    size_hidden = 300
+    
+    # create model structure
+    model = build_model(batchNormalize, activation_function, size_hidden)
+    
     # initializing label in vector form [1, 0, ...], [0, 1, ...], ...
     y_train_vectors = keras.utils.to_categorical(y_train)
     y_test_vectors = keras.utils.to_categorical(y_test)
@@ -177,12 +164,61 @@ def neural_network(data, batchNormalize=True, learning_rate=0.00001, batch_train
         return [_history, results, _prediction_info, _batch_learning_curve_info.returnTraining(), _batch_learning_curve_info.returnTesting(), model]
     return [_history, results, _prediction_info, model]
 
+def neural_network_streaming(directory, batchNormalize=True, learning_rate=0.00001, activation_function='ReLU', seed=0):
+    # train on every parsed pair, streamed from the store with tf.data instead of loaded into memory
+    from tensorflow import keras
+    from NNModel.Util.pipeline import make_dataset, split_rows
+    from NNModel.Util.graphs import parameter_tuning, confusion_matrix, roc_graph
+
+    # Hyperparameters
+    num_epochs = 20
+    batch_size = 75
+    eta = learning_rate
+    decay_factor = 0.95
+    size_hidden = 300
+    shuffle_buffer = 1000000
+    
+    # create model structure
+    model = build_model(batchNormalize, activation_function, size_hidden)
+    
+    # datasets of normalized features and label vectors, split per row as in dataset_split
+    train_data = make_dataset(directory, "train", batch_size, shuffle_buffer, seed)
+    validate_data = make_dataset(directory, "validate", batch_size, seed=seed)
+    test_data = make_dataset(directory, "test", batch_size, seed=seed)
+    
+    # setting up optimizer and scheduler
+    learning_rate_schedule = keras.optimizers.schedules.ExponentialDecay(initial_learning_rate=eta, decay_steps=split_rows(directory, "train"), decay_rate=decay_factor)
+    optimizer = keras.optimizers.Adam(learning_rate=learning_rate_schedule)
+    loss_function = keras.losses.categorical_crossentropy
+    
+    # setting up model
+    model.compile(loss=loss_function, optimizer=optimizer, metrics='accuracy')
+    _history = model.fit(train_data, epochs=num_epochs, validation_data=validate_data, verbose=2)
+    
+    # evaluate the model's final performance
+    results = model.evaluate(test_data)
+    predictions = model.predict(test_data)
+    y_test_vectors = np.concatenate([y for x, y in test_data.as_numpy_iterator()])
+    _prediction_info = _compare_results(predictions, y_test_vectors)
+    correct = _prediction_info[2]
+    wrong = _prediction_info[3]
+    total = correct + wrong
+    print(f"Total: {total}, Correct: {correct}, Incorrect: {wrong}")
+    
+    # plotting results
+    parameter_tuning(_history.history['val_loss'], _history.history['loss'])
+    confusion_matrix(_prediction_info)
+    roc_graph(_prediction_info)
+    
+    # return: fit, evaluation, prediction, model
+    return [_history, results, _prediction_info, model]
+
 def run_NNModel(model, data):
     # predict data using model
     features = data[0]
     labels_raw = data[1]
-    labels = labels_raw[:, 0].astype(np.float32)
-    y_vectors = utils.to_categorical(labels)
+    labels = labels_raw[:, 0].astype(np.float32).astype(np.int64)
+    y_vectors = np.eye(labels.max() + 1, dtype=np.float32)[labels]
     y_vectors = fix_vectors(y_vectors)
     predictions = model.predict(features)
     _prediction_info = _compare_results(predictions, y_vectors)
@@ -190,16 +226,29 @@ def run_NNModel(model, data):
     return np.append(y_predicted, labels_raw, axis = 1)
 
 def save_model(model, fileName):
-    # save the model
+    # save the model, along with its weights for NumPy inference
     cwd = os.getcwd()
     sm_path = "/NNModel/SavedModels/"
     os.makedirs(os.path.dirname(cwd + sm_path), exist_ok=True)
     model.save(cwd + sm_path + fileName)
+    export_model(model, cwd + sm_path + fileName + ".npz")
 
-# load the model
-def load_model(fileName):
+def export_numpy_model(fileName):
+    # export the weights of a saved model for NumPy inference
+    from tensorflow import keras
     cwd = os.getcwd()
     sm_path = "/NNModel/SavedModels/"
     model = keras.models.load_model(cwd + sm_path + fileName)
+    export_model(model, cwd + sm_path + fileName + ".npz")
+
+# load the model, preferring the NumPy inference weights when they have been exported
+def load_model(fileName):
+    cwd = os.getcwd()
+    sm_path = "/NNModel/SavedModels/"
+    if os.path.exists(cwd + sm_path + fileName + ".npz"):
+        model = NumpyModel(cwd + sm_path + fileName + ".npz")
+    else:
+        from tensorflow import keras
+        model = keras.models.load_model(cwd + sm_path + fileName)
     model.summary()
-    return model
\ No newline at end of file
+    return model
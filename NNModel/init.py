@@ -1,6 +1,7 @@
 # Files in the NNModel Package developed by Francisco Benavides github.com/1aidea
 
-from NNModel.blackBox import neural_network, save_model, load_ss_data
+import os
+from NNModel.blackBox import neural_network, neural_network_streaming, save_model, load_ss_data
 from NNModel.Util.helper import dataset_split, feature_scaling
 
 """
@@ -11,9 +12,15 @@ Notation:
     NF = No Feature scaling
     YF = Yes Feature scaling
 """
-def train():
+def train(jobs=1, backend="auto", seed=0, stream=False):
+    if stream:
+        print("STREAMING DATA")
+        YBYF_M1 = neural_network_streaming(os.getcwd() + "/Data/Store/", False, learning_rate=0.00001, seed=seed)
+        save_model(YBYF_M1[3], "YBYF_Model_1")
+        print("MODEL SAVED")
+        return
     print("LOADING DATA")
-    ss_dataset = load_ss_data()
+    ss_dataset = load_ss_data(jobs, backend, seed)
     print("PREPROCESSING DATA")
     # feature_scaled_ss_dataset = feature_scaling(ss_dataset)
     # split_ss_data = dataset_split(feature_scaled_ss_dataset[0], feature_scaled_ss_dataset[1])
@@ -1,13 +1,130 @@
 # Files in the NNModel Package developed by Francisco Benavides github.com/1aidea
 
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import Parser.parsePDB as parser
 from NNModel.blackBox import load_single_data, run_NNModel
-from NNModel.Util.graphs import plot_data
 
-def test(data, name, NNModel):
+def plot_pdb(plot, data, name):
+    # plot is True to graph the data here, a function such as a graphs.PlotPool to pass it to, or False
+    if plot is True:
+        from NNModel.Util.graphs import plot_data
+        try:
+            plot_data(data, name)
+        except Exception as e:
+            print(name, "graph failed:", repr(e))
+    elif plot:
+        plot(data, name)
+
+def request_plot(request, plot):
+    # requests may turn off the graph with 'plot': False, e.g. from -e --no-plots --connect
+    return plot if request.get('plot', True) else False
+
+def test(data, name, NNModel, plot=True):
     # evaluate a single PDB with the passed model
     dataset = load_single_data(data)
-    plot_data(dataset[0], name)
+    plot_pdb(plot, dataset[0], name)
     return run_NNModel(NNModel, dataset)
 
+def test_many(datas, names, NNModel, plot=True):
+    # evaluate several PDBs with one prediction over all their pairs, returning the results of each;
+    # plot is as for test, or a list of one such value per PDB
+    plots = plot if isinstance(plot, list) else [plot] * len(names)
+    offsets = np.cumsum([0] + [len(data) for data in datas])
+    dataset = load_single_data(np.concatenate(datas))
+    for name, plot_one, start, stop in zip(names, plots, offsets[:-1], offsets[1:]):
+        plot_pdb(plot_one, dataset[0][start:stop], name)
+    results = run_NNModel(NNModel, dataset)
+    return [results[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+def rank(results):
+    # split evaluated pairs at 50% confidence, most likely disulfide bonds first
+    support_ss = []
+    no_support_ss = []
+    for i in range(len(results)):
+        if float(results[i][1]) >= .5:
+            support_ss.append(results[i])
+        else:
+            no_support_ss.append(results[i])
+    support_ss.sort(key=lambda x: float(x[0]))
+    no_support_ss.sort(key=lambda x: float(x[1]), reverse=True)
+    return [support_ss, no_support_ss]
+
+def report(name, ranked):
+    # text of the prediction report for one PDB
+    lines = [f"{name}\n", "\nres 1  res 2  confidence\n\n"]
+    for i in ranked[0]:
+        lines.append(f"{i[3]} {i[4]:4} {i[5]} {i[6]:4} {float(i[1]):.4f}\n")
+    lines.append("\n")
+    for i in ranked[1]:
+        lines.append(f"{i[3]} {i[4]:4} {i[5]} {i[6]:4} {float(i[1]):.4f}\n")
+    return "".join(lines)
+
+def parse_request(request, mem_budget=None):
+    # parse the PDB of a request {'name', 'path' or 'pdb' contents, 'all_residues'}; a file
+    # that cannot be read fails alone with the error as its data, as in parser.parse_many
+    test_all = request.get('all_residues', False)
+    try:
+        if 'pdb' in request:
+            return parser.parse_string(request['pdb'], test_all, mem_budget)
+        return parser.parse(request['path'], test_all, mem_budget)
+    except MemoryError:
+        raise
+    except Exception as e:
+        return (1, repr(e))
+
+def parse_pool(jobs, threads=None):
+    # processes of threads threads each parsing the requests of evaluate_many, kept for every
+    # batch; they are started here, so create the pool before loading the model and forked
+    # workers do not copy it. None, parsing in this process, for a single job
+    if jobs <= 1:
+        return None
+    pool = ProcessPoolExecutor(jobs, initializer=parser.init_worker, initargs=(threads, parser.geometry_name))
+    pool.submit(int).result()
+    return pool
+
+def pair_table(raw):
+    # parsed pairs as rows of dist, omega, theta, phi, ssbond, chain 1, res 1, chain 2, res 2
+    return np.array([[i['dist'], i['omega'], i['theta'], i['phi'], i['ssbond'], i['chain1'], i['res1'], i['chain2'], i['res2']] for i in raw])
+
+def _response(name, results):
+    ranked = rank(results)
+    pairs = [[i[3], int(i[4]), i[5], int(i[6]), float(i[1])] for i in ranked[0] + ranked[1]]
+    return {'name': name, 'status': "evaluated", 'pairs': pairs, 'report': report(name, ranked)}
+
+def evaluate(request, NNModel, mem_budget=None, plot=True):
+    # evaluate the PDB of one request
+    name = request['name']
+    errc, raw = parse_request(request, mem_budget)
+    if errc != 0:
+        return {'name': name, 'status': "parse failed"}
+    return _response(name, test(pair_table(raw), name, NNModel, request_plot(request, plot)))
+
+def evaluate_many(requests, NNModel, mem_budget=None, pool=None, plot=True):
+    # evaluate the PDBs of several requests, parsing them in the processes of a parse_pool
+    # and running the model once over the pairs of all of them
+    if pool:
+        parsed = list(pool.map(parse_request, requests, [mem_budget] * len(requests)))
+    else:
+        parsed = [parse_request(request, mem_budget) for request in requests]
+    responses = []
+    datas = []
+    names = []
+    plots = []
+    positions = []
+    for request, (errc, raw) in zip(requests, parsed):
+        if errc != 0:
+            responses.append({'name': request['name'], 'status': "parse failed"})
+        else:
+            responses.append(None)
+            datas.append(pair_table(raw))
+            names.append(request['name'])
+            plots.append(request_plot(request, plot))
+            positions.append(len(responses) - 1)
+    if datas != []:
+        for k, name, results in zip(positions, names, test_many(datas, names, NNModel, plots)):
+            responses[k] = _response(name, results)
+    return responses
+
 if __name__=="__main__":
-    test()
\ No newline at end of file
+    test()
@@ -0,0 +1,96 @@
+# Files in the NNModel Package developed by Francisco Benavides github.com/1aidea
+
+import numpy as np
+
+"""
+
+    NumPy Inference Engine
+
+    The saved models are stacks of Dense, BatchNormalization and Dropout layers.
+    At inference Dropout does nothing and BatchNormalization is an affine transform,
+    which is folded into the weights of the Dense layer that follows it, leaving
+    a list of (weights, bias, activation) layers.
+
+"""
+
+def _softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+activations = {
+    'relu': lambda x: np.maximum(x, 0),
+    'softmax': _softmax,
+    'sigmoid': lambda x: 1 / (1 + np.exp(-x)),
+    'tanh': np.tanh,
+    'linear': lambda x: x,
+}
+
+def _activation_name(layer):
+    # activations may be stored by name, e.g. 'ReLU', or as a serialized layer
+    activation = layer.get_config()['activation']
+    if isinstance(activation, dict):
+        activation = activation['class_name']
+    activation = activation.lower()
+    if activation not in activations:
+        raise ValueError(f"cannot export activation {activation} of layer {layer.name}")
+    return activation
+
+def export_model(model, path):
+    # write the inference weights of a Sequential keras model to a .npz file
+    weights = {}
+    names = []
+    scale = None
+    shift = None
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind == 'Dense':
+            config = layer.get_config()
+            w = layer.kernel.numpy().astype(np.float64)
+            b = layer.bias.numpy().astype(np.float64) if config['use_bias'] else np.zeros(w.shape[1])
+            if scale is not None:
+                # dense(scale * x + shift) = dense'(x)
+                b = b + shift @ w
+                w = scale[:, None] * w
+                scale = None
+                shift = None
+            weights[f"w{len(names)}"] = w.astype(np.float32)
+            weights[f"b{len(names)}"] = b.astype(np.float32)
+            names.append(_activation_name(layer))
+        elif kind == 'BatchNormalization':
+            gamma = layer.gamma.numpy() if layer.scale else 1.0
+            beta = layer.beta.numpy() if layer.center else 0.0
+            s = gamma / np.sqrt(layer.moving_variance.numpy() + layer.epsilon)
+            t = beta - layer.moving_mean.numpy() * s
+            if scale is None:
+                scale, shift = s, t
+            else:
+                scale, shift = scale * s, shift * s + t
+        elif kind in ('Dropout', 'InputLayer'):
+            continue
+        else:
+            raise ValueError(f"cannot export layer {layer.name} of type {kind}")
+    if scale is not None:
+        raise ValueError("cannot export a model ending in BatchNormalization")
+    np.savez(path, activations=np.array(names), **weights)
+
+class NumpyModel:
+    # forward pass of an exported model, with the predict interface of a keras model
+    def __init__(self, path):
+        with np.load(path) as f:
+            self.layers = [(f[f"w{i}"], f[f"b{i}"], str(a)) for i, a in enumerate(f['activations'])]
+
+    def predict(self, features, batch_size=65536):
+        out = []
+        for start in range(0, len(features), batch_size):
+            x = np.asarray(features[start:start + batch_size], dtype=np.float32)
+            for w, b, activation in self.layers:
+                x = activations[activation](x @ w + b)
+            out.append(x)
+        if out == []:
+            return np.zeros((0, self.layers[-1][0].shape[1]), dtype=np.float32)
+        return np.concatenate(out)
+
+    def summary(self):
+        print("NumPy inference model")
+        for i, (w, b, activation) in enumerate(self.layers):
+            print(f"dense {i}: {w.shape[0]} -> {w.shape[1]}, {activation}")
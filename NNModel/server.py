@@ -0,0 +1,76 @@
+# Files in the NNModel Package developed by Francisco Benavides github.com/1aidea
+
+import json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+"""
+
+    Evaluation Server
+
+    POST a JSON request {"name": ..., "path": ... or "pdb": ..., "all_residues": ..., "plot": ...}
+    to http://localhost:<port>/ and receive {"name", "status", "pairs", "report"},
+    where pairs are [chain 1, res 1, chain 2, res 2, confidence], most likely first;
+    POST a list of requests to evaluate them together and receive a list of responses
+
+"""
+
+host = "localhost"
+default_port = 8650
+
+class EvaluationHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        try:
+            request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            response = self.server.evaluate(request)
+            code = 200
+        except Exception as e:
+            response = {'status': "error", 'error': str(e)}
+            code = 500
+        body = json.dumps(response).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(NNModel, port=default_port, mem_budget=None, pool=None, plot=True):
+    # evaluate requests with an already loaded model until interrupted, parsing lists of
+    # requests in the processes of a launchModel.parse_pool
+    from NNModel.launchModel import evaluate, evaluate_many
+    server = HTTPServer((host, port), EvaluationHandler)
+
+    def evaluate_request(request):
+        if isinstance(request, list):
+            responses = evaluate_many(request, NNModel, mem_budget, pool, plot)
+        else:
+            responses = [evaluate(request, NNModel, mem_budget, plot)]
+        for response in responses:
+            print(response['name'], response['status'])
+        return responses if isinstance(request, list) else responses[0]
+
+    server.evaluate = evaluate_request
+    print(f"serving on http://{host}:{port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def query(request, port=default_port):
+    # send one request to a running server, returning its response;
+    # raises ConnectionError when nothing is listening on the port
+    body = json.dumps(request).encode()
+    http_request = Request(f"http://{host}:{port}/", data=body, headers={"Content-Type": "application/json"})
+    try:
+        with urlopen(http_request) as response:
+            return json.loads(response.read())
+    except HTTPError as e:
+        return json.loads(e.read())
+    except URLError as e:
+        raise ConnectionError(f"no server listening on port {port}") from e
@@ -2,6 +2,7 @@
 
 import numpy as np
 import torch
+from scipy.spatial import cKDTree
 
 # ============================================================
 def get_pair_dist(a, b):
@@ -126,6 +127,172 @@ def xyz_to_c6d(xyz, params):
     return c6d
     
 
+# ============================================================
+def xyz_to_c6d_sparse(xyz, params):
+    """convert cartesian coordinates into a list of distance and
+    orientation features for the residue pairs in contact, found
+    with a KD-tree so memory scales with contacts instead of nres^2
+    
+    Parameters
+    ----------
+    xyz : pytorch tensor of shape [batch,3,nres,3]
+          stores Cartesian coordinates of backbone N,Ca,C atoms
+    Returns
+    -------
+    b,i,j : pytorch tensors of shape [npairs]
+            batch and residue indices of each pair with Cb-Cb distance
+            below params['DMAX'], i < j, sorted by (b,i,j)
+    c6d : pytorch tensor of shape [npairs,4]
+          stores stacked dist,omega,theta,phi of each pair
+    """
+
+    batch = xyz.shape[0]
+
+    # three anchor atoms
+    N  = xyz[:,0]
+    Ca = xyz[:,1]
+    C  = xyz[:,2]
+    Cb = get_cb(N, Ca, C)
+
+    # neighbour search on the residues with all anchor atoms present
+    pairs = []
+    for k in range(batch):
+        cb = Cb[k].detach().cpu().numpy()
+        valid = np.flatnonzero(~np.isnan(cb).any(axis=-1))
+        ij = cKDTree(cb[valid]).query_pairs(params['DMAX'], output_type='ndarray')
+        ij = valid[ij.reshape(-1,2)]
+        pairs.append(np.concatenate([np.full((len(ij),1), k), ij], axis=1))
+    pairs = np.concatenate(pairs)
+    pairs = pairs[np.lexsort((pairs[:,2], pairs[:,1], pairs[:,0]))]
+    b,i,j = torch.tensor(pairs, dtype=torch.long, device=xyz.device).T
+
+    dist = torch.norm(Cb[b,i] - Cb[b,j], dim=-1)
+    contact = dist < params['DMAX']
+    b,i,j,dist = b[contact],i[contact],j[contact],dist[contact]
+
+    # 6d coordinates order: (dist,omega,theta,phi)
+    c6d = torch.stack([dist,
+                       get_dih(Ca[b,i], Cb[b,i], Cb[b,j], Ca[b,j]),
+                       get_dih(N[b,i], Ca[b,i], Cb[b,i], Cb[b,j]),
+                       get_ang(Ca[b,i], Cb[b,i], Cb[b,j])], dim=-1)
+    
+    return b, i, j, c6d
+    
+
+# ============================================================
+def c6d_tiles(xyz, params, max_bytes):
+    """compute the dense distance and orientation maps in row tiles
+    sized to stay within max_bytes, yielding the residue pairs in contact
+    from each tile as they are found
+    
+    Parameters
+    ----------
+    xyz : pytorch tensor of shape [batch,3,nres,3]
+          stores Cartesian coordinates of backbone N,Ca,C atoms
+    max_bytes : memory budget for the distance tile of each step
+    Yields
+    -------
+    b,i,j,c6d : pair lists of one tile, as returned by xyz_to_c6d_sparse
+    """
+
+    batch = xyz.shape[0]
+    nres = xyz.shape[2]
+
+    # three anchor atoms
+    N  = xyz[:,0]
+    Ca = xyz[:,1]
+    C  = xyz[:,2]
+    Cb = get_cb(N, Ca, C)
+
+    # a tile holds rows x nres distances plus masks of the same shape
+    rows = max(1, int(max_bytes // (4 * nres * xyz.element_size())))
+    for k in range(batch):
+        for start in range(0, nres, rows):
+            stop = min(start + rows, nres)
+
+            # only columns right of the diagonal are needed, j > i
+            dist = get_pair_dist(Cb[k,start:stop], Cb[k,start:])
+            dist[torch.isnan(dist)] = 999.9
+            ti,tj = torch.where(dist < params['DMAX'])
+            upper = tj > ti
+            dist = dist[ti[upper],tj[upper]]
+            i = ti[upper] + start
+            j = tj[upper] + start
+            b = torch.full_like(i, k)
+
+            # 6d coordinates order: (dist,omega,theta,phi)
+            c6d = torch.stack([dist,
+                               get_dih(Ca[b,i], Cb[b,i], Cb[b,j], Ca[b,j]),
+                               get_dih(N[b,i], Ca[b,i], Cb[b,i], Cb[b,j]),
+                               get_ang(Ca[b,i], Cb[b,i], Cb[b,j])], dim=-1)
+            yield b, i, j, c6d
+
+
+# ============================================================
+def xyz_to_c6d_tiled(xyz, params, max_bytes):
+    """dense equivalent of xyz_to_c6d_sparse, computing the maps in
+    row tiles within a memory budget of max_bytes
+    """
+
+    tiles = list(c6d_tiles(xyz, params, max_bytes))
+    if tiles == []:
+        empty = torch.zeros(0, dtype=torch.long, device=xyz.device)
+        return empty, empty, empty, torch.zeros((0,4), dtype=xyz.dtype, device=xyz.device)
+    return tuple(torch.cat(t) for t in zip(*tiles))
+    
+
+# ============================================================
+def pad_xyz(xyzs):
+    """pack the backbone coordinates of several structures into one
+    batch, padding the shorter ones with NaN
+    
+    Parameters
+    ----------
+    xyzs : list of numpy arrays of shape [nres,3,3]
+           stores Cartesian coordinates of backbone N,Ca,C atoms
+    Returns
+    -------
+    xyz : pytorch tensor of shape [batch,3,max nres,3]
+          as taken by xyz_to_c6d; NaN residues have no contacts
+    mask : pytorch tensor of shape [batch,max nres]
+           True for the real residues of each structure
+    """
+
+    nres = max(len(x) for x in xyzs)
+    xyz = np.full((len(xyzs), nres, 3, 3), np.nan, dtype=np.float32)
+    mask = np.zeros((len(xyzs), nres), dtype=bool)
+    for k, x in enumerate(xyzs):
+        xyz[k,:len(x)] = x
+        mask[k,:len(x)] = True
+    return torch.from_numpy(xyz).permute(0,2,1,3), torch.from_numpy(mask)
+
+
+# ============================================================
+def xyz_to_c6d_batch(xyzs, params):
+    """distance and orientation features of the residue pairs in
+    contact for several structures, computed by one padded xyz_to_c6d
+    
+    Parameters
+    ----------
+    xyzs : list of numpy arrays of shape [nres,3,3]
+           stores Cartesian coordinates of backbone N,Ca,C atoms
+    Returns
+    -------
+    pairs : list of (i,j,c6d) numpy arrays for each structure, with the
+            pairs i < j in contact in the order of xyz_to_c6d's maps
+    """
+
+    xyz, mask = pad_xyz(xyzs)
+    c6d = xyz_to_c6d(xyz, params)
+    valid = mask[:,:,None] & mask[:,None,:] & (c6d[...,0] < 999)
+    # b,i,j sorted by structure, then row, then column
+    b,i,j = torch.where(torch.triu(valid, diagonal=1))
+    c6d = c6d[b,i,j].numpy()
+    b,i,j = b.numpy(), i.numpy(), j.numpy()
+    bounds = np.searchsorted(b, np.arange(len(xyzs) + 1))
+    return [(i[lo:hi], j[lo:hi], c6d[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    
+
 # ============================================================
 def c6d_to_bins(c6d,params):
     """bin 2d distance and orientation maps
@@ -0,0 +1,140 @@
+# developed by Michael Reilly github.com/mreilly13
+
+import os
+import zlib
+import hashlib
+import sqlite3
+
+# the manifest is an SQLite database with one row per downloaded PDB, recording the size,
+# modification time and checksum of its compressed file, the checksum it was last unzipped
+# from, and the outcome of parsing it: status is None until parsed, then "parsed", "failed",
+# "no bonds" or "unzip failed", with the failure reason or the shard and row count of its
+# pairs in the store
+# a changed checksum resets status, so later runs only unzip and parse changed entries
+manifest_name = "manifest.db"
+
+schema = """
+CREATE TABLE IF NOT EXISTS pdb (
+    name TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL,
+    checksum TEXT,
+    unzipped TEXT,
+    status TEXT,
+    reason TEXT,
+    rows INTEGER,
+    shard TEXT,
+    parsed REAL
+)
+"""
+
+def partition(name, parts):
+    # which of parts partitions a PDB belongs to, from a hash of its 4 character ID,
+    # the same on every machine and Python version
+    return zlib.crc32(name[-4:].lower().encode()) % parts
+
+def checksum(path):
+    # md5 of a file, read in 1 MB blocks
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(2**20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class Manifest:
+    def __init__(self, path):
+        self.created = not os.path.exists(path)
+        self.db = sqlite3.connect(path)
+        self.db.execute(schema)
+        self.db.commit()
+
+    def scan(self, directory, ext, select=None):
+        # bring the entries up to date with the files ending in ext in the directory, or those
+        # of them whose names pass select, hashing only files whose size or modification time
+        # changed; returns the number of new or changed files
+        known = {name: (size, mtime, digest) for name, size, mtime, digest in self.db.execute("SELECT name, size, mtime, checksum FROM pdb")}
+        present = set()
+        changed = 0
+        with os.scandir(directory) as files:
+            for entry in files:
+                if not entry.name.endswith(ext):
+                    continue
+                name = entry.name[:-len(ext)]
+                if select and not select(name):
+                    continue
+                present.add(name)
+                stat = entry.stat()
+                old = known.get(name)
+                if old and old[0] == stat.st_size and old[1] == stat.st_mtime:
+                    continue
+                digest = checksum(entry.path)
+                if old and old[2] == digest:
+                    # touched but not changed, e.g. by a new download of the same file
+                    self.db.execute("UPDATE pdb SET size = ?, mtime = ? WHERE name = ?", (stat.st_size, stat.st_mtime, name))
+                    continue
+                self.db.execute("INSERT OR REPLACE INTO pdb (name, size, mtime, checksum) VALUES (?, ?, ?, ?)", (name, stat.st_size, stat.st_mtime, digest))
+                changed += 1
+        removed = [(name,) for name in known if name not in present]
+        self.db.executemany("DELETE FROM pdb WHERE name = ?", removed)
+        self.db.commit()
+        return changed
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM pdb").fetchone()[0]
+
+    def to_unzip(self):
+        # names whose current compressed file has not been unzipped
+        return [name for name, in self.db.execute("SELECT name FROM pdb WHERE unzipped IS NOT checksum AND status IS NOT 'unzip failed' ORDER BY name")]
+
+    def to_parse(self):
+        # names whose current compressed file has not been parsed
+        return [name for name, in self.db.execute("SELECT name FROM pdb WHERE status IS NULL ORDER BY name")]
+
+    def set_unzipped(self, name):
+        self.db.execute("UPDATE pdb SET unzipped = checksum WHERE name = ?", (name,))
+
+    def set_failed(self, name, status, reason):
+        self.db.execute("UPDATE pdb SET status = ?, reason = ?, rows = NULL, shard = NULL, parsed = NULL WHERE name = ?", (status, reason, name))
+
+    def set_stored(self, entries):
+        # record (name, shard, offset, count, parsed) entries written to the store
+        self.db.executemany("UPDATE pdb SET status = 'parsed', reason = NULL, shard = ?, rows = ?, parsed = ? WHERE name = ?",
+            [(shard, count, parsed, name) for name, shard, offset, count, parsed in entries])
+        self.db.commit()
+
+    def failures(self):
+        # (name, status, reason) of every PDB that did not produce training data
+        return list(self.db.execute("SELECT name, status, reason FROM pdb WHERE status IN ('failed', 'no bonds', 'unzip failed') ORDER BY name"))
+
+    def merge(self, path, select=None, shards={}):
+        # copy the entries of another manifest, or those whose names pass select, over these;
+        # shards maps the names of entries whose pairs moved to the shard now holding them
+        other = sqlite3.connect(path)
+        rows = [row for row in other.execute("SELECT * FROM pdb") if not select or select(row[0])]
+        other.close()
+        rows = [row[:8] + (shards.get(row[0], row[8]),) + row[9:] for row in rows]
+        self.db.executemany(f"INSERT OR REPLACE INTO pdb VALUES ({', '.join('?' * 10)})", rows)
+        self.db.commit()
+        return len(rows)
+
+    def import_legacy(self, index, failed, raw_dir, zip_ext, pdb_dir, pdb_ext):
+        # fill a new manifest from the state kept by older versions: the store index, the
+        # names listed in failed.csv, and unzipped files newer than their compressed file
+        rows = []
+        for name, in self.db.execute("SELECT name FROM pdb").fetchall():
+            raw_mtime = os.path.getmtime(os.path.join(raw_dir, name + zip_ext))
+            pdb_path = os.path.join(pdb_dir, name + pdb_ext)
+            if os.path.exists(pdb_path) and raw_mtime < os.path.getmtime(pdb_path):
+                self.set_unzipped(name)
+            if name in index and raw_mtime < index[name][3]:
+                rows.append((name,) + index[name])
+            elif name in failed:
+                self.set_failed(name, "failed", "listed in failed.csv")
+        self.set_stored(rows)
+
+    def commit(self):
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
@@ -0,0 +1,291 @@
+# NumPy version of Parser/Util/geometry.py, with the same functions taking and returning
+# numpy arrays, so parsing does not need to load torch
+# code modified from https://github.com/RosettaCommons/RFDesign/tree/main/hallucination/util/geometry.py
+
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+
+# ============================================================
+def get_pair_dist(a, b):
+    """calculate pair distances between two sets of points
+
+    Parameters
+    ----------
+    a,b : numpy arrays of shape [batch,nres,3]
+          store Cartesian coordinates of two sets of atoms
+    Returns
+    -------
+    dist : numpy array of shape [batch,nres,nres]
+           stores pairwise distances between atoms in a and b
+    """
+
+    dist = np.stack([cdist(a[k], b[k]) for k in range(a.shape[0])])
+    return dist.astype(a.dtype)
+
+# ============================================================
+def get_ang(a, b, c):
+    """calculate planar angles for all consecutive triples (a[i],b[i],c[i])
+    from Cartesian coordinates of three sets of atoms a,b,c
+    Parameters
+    ----------
+    a,b,c : numpy arrays of shape [batch,nres,3]
+            store Cartesian coordinates of three sets of atoms
+    Returns
+    -------
+    ang : numpy array of shape [batch,nres]
+          stores resulting planar angles
+    """
+    v = a - b
+    w = c - b
+    v = v / np.linalg.norm(v, axis=-1, keepdims=True)
+    w = w / np.linalg.norm(w, axis=-1, keepdims=True)
+
+    # https://math.stackexchange.com/questions/1143354/numerically-stable-method-for-angle-between-3d-vectors/1782769
+    y = np.linalg.norm(v-w, axis=-1)
+    x = np.linalg.norm(v+w, axis=-1)
+    ang = 2*np.arctan2(y, x)
+
+    return ang
+
+# ============================================================
+def get_dih(a, b, c, d):
+    """calculate dihedral angles for all consecutive quadruples (a[i],b[i],c[i],d[i])
+    given Cartesian coordinates of four sets of atoms a,b,c,d
+    Parameters
+    ----------
+    a,b,c,d : numpy arrays of shape [batch,nres,3]
+              store Cartesian coordinates of four sets of atoms
+    Returns
+    -------
+    dih : numpy array of shape [batch,nres]
+          stores resulting dihedrals
+    """
+    b0  = a - b
+    b1r = c - b
+    b2  = d - c
+
+    b1 = b1r/np.linalg.norm(b1r, axis=-1, keepdims=True)
+
+    v = b0 - np.sum(b0*b1, axis=-1, keepdims=True)*b1
+    w = b2 - np.sum(b2*b1, axis=-1, keepdims=True)*b1
+
+    x = np.sum(v*w, axis=-1)
+    y = np.sum(np.cross(b1,v)*w, axis=-1)
+    ang = np.arctan2(y, x)
+
+    return ang
+
+
+# ============================================================
+def pair_features(N, Ca, Cb, b, i, j, dist):
+    """stack the dist,omega,theta,phi of the pairs (b,i,j)"""
+    return np.stack([dist,
+                     get_dih(Ca[b,i], Cb[b,i], Cb[b,j], Ca[b,j]),
+                     get_dih(N[b,i], Ca[b,i], Cb[b,i], Cb[b,j]),
+                     get_ang(Ca[b,i], Cb[b,i], Cb[b,j])], axis=-1).astype(Ca.dtype)
+
+
+# ============================================================
+def xyz_to_c6d(xyz, params):
+    """convert cartesian coordinates into 2d distance
+    and orientation maps
+
+    Parameters
+    ----------
+    xyz : numpy array of shape [batch,3,nres,3]
+          stores Cartesian coordinates of backbone N,Ca,C atoms
+    Returns
+    -------
+    c6d : numpy array of shape [batch,nres,nres,4]
+          stores stacked dist,omega,theta,phi 2D maps
+    """
+
+    batch = xyz.shape[0]
+    nres = xyz.shape[2]
+
+    # three anchor atoms
+    N  = xyz[:,0]
+    Ca = xyz[:,1]
+    C  = xyz[:,2]
+    Cb = get_cb(N, Ca, C)
+
+    # 6d coordinates order: (dist,omega,theta,phi)
+    c6d = np.zeros([batch,nres,nres,4], dtype=xyz.dtype)
+
+    dist = get_pair_dist(Cb,Cb)
+    dist[np.isnan(dist)] = 999.9
+    c6d[...,0] = dist + 999.9*np.eye(nres, dtype=xyz.dtype)[None,...]
+    b,i,j = np.nonzero(c6d[...,0]<params['DMAX'])
+
+    c6d[b,i,j,1:] = pair_features(N, Ca, Cb, b, i, j, c6d[b,i,j,0])[:,1:]
+
+    # fix long-range distances
+    c6d[...,0][c6d[...,0]>=params['DMAX']] = 999.9
+
+    return c6d
+
+
+# ============================================================
+def xyz_to_c6d_sparse(xyz, params):
+    """convert cartesian coordinates into a list of distance and
+    orientation features for the residue pairs in contact, found
+    with a KD-tree so memory scales with contacts instead of nres^2
+
+    Parameters
+    ----------
+    xyz : numpy array of shape [batch,3,nres,3]
+          stores Cartesian coordinates of backbone N,Ca,C atoms
+    Returns
+    -------
+    b,i,j : numpy arrays of shape [npairs]
+            batch and residue indices of each pair with Cb-Cb distance
+            below params['DMAX'], i < j, sorted by (b,i,j)
+    c6d : numpy array of shape [npairs,4]
+          stores stacked dist,omega,theta,phi of each pair
+    """
+
+    batch = xyz.shape[0]
+
+    # three anchor atoms
+    N  = xyz[:,0]
+    Ca = xyz[:,1]
+    C  = xyz[:,2]
+    Cb = get_cb(N, Ca, C)
+
+    # neighbour search on the residues with all anchor atoms present
+    pairs = []
+    for k in range(batch):
+        valid = np.flatnonzero(~np.isnan(Cb[k]).any(axis=-1))
+        ij = cKDTree(Cb[k][valid]).query_pairs(params['DMAX'], output_type='ndarray')
+        ij = valid[ij.reshape(-1,2)]
+        pairs.append(np.concatenate([np.full((len(ij),1), k), ij], axis=1))
+    pairs = np.concatenate(pairs)
+    pairs = pairs[np.lexsort((pairs[:,2], pairs[:,1], pairs[:,0]))]
+    b,i,j = pairs.T
+
+    dist = np.linalg.norm(Cb[b,i] - Cb[b,j], axis=-1)
+    contact = dist < params['DMAX']
+    b,i,j,dist = b[contact],i[contact],j[contact],dist[contact]
+
+    # 6d coordinates order: (dist,omega,theta,phi)
+    return b, i, j, pair_features(N, Ca, Cb, b, i, j, dist)
+
+
+# ============================================================
+def c6d_tiles(xyz, params, max_bytes):
+    """compute the dense distance and orientation maps in row tiles
+    sized to stay within max_bytes, yielding the residue pairs in contact
+    from each tile as they are found
+
+    Parameters
+    ----------
+    xyz : numpy array of shape [batch,3,nres,3]
+          stores Cartesian coordinates of backbone N,Ca,C atoms
+    max_bytes : memory budget for the distance tile of each step
+    Yields
+    -------
+    b,i,j,c6d : pair lists of one tile, as returned by xyz_to_c6d_sparse
+    """
+
+    batch = xyz.shape[0]
+    nres = xyz.shape[2]
+
+    # three anchor atoms
+    N  = xyz[:,0]
+    Ca = xyz[:,1]
+    C  = xyz[:,2]
+    Cb = get_cb(N, Ca, C)
+
+    # a tile holds rows x nres distances plus masks of the same shape
+    rows = max(1, int(max_bytes // (4 * nres * xyz.itemsize)))
+    for k in range(batch):
+        for start in range(0, nres, rows):
+            stop = min(start + rows, nres)
+
+            # only columns right of the diagonal are needed, j > i
+            dist = get_pair_dist(Cb[k:k+1,start:stop], Cb[k:k+1,start:])[0]
+            dist[np.isnan(dist)] = 999.9
+            ti,tj = np.nonzero(dist < params['DMAX'])
+            upper = tj > ti
+            dist = dist[ti[upper],tj[upper]]
+            i = ti[upper] + start
+            j = tj[upper] + start
+            b = np.full_like(i, k)
+
+            # 6d coordinates order: (dist,omega,theta,phi)
+            yield b, i, j, pair_features(N, Ca, Cb, b, i, j, dist)
+
+
+# ============================================================
+def xyz_to_c6d_tiled(xyz, params, max_bytes):
+    """dense equivalent of xyz_to_c6d_sparse, computing the maps in
+    row tiles within a memory budget of max_bytes
+    """
+
+    tiles = list(c6d_tiles(xyz, params, max_bytes))
+    if tiles == []:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, np.zeros((0,4), dtype=xyz.dtype)
+    return tuple(np.concatenate(t) for t in zip(*tiles))
+
+
+# ============================================================
+def pad_xyz(xyzs):
+    """pack the backbone coordinates of several structures into one
+    batch, padding the shorter ones with NaN
+
+    Parameters
+    ----------
+    xyzs : list of numpy arrays of shape [nres,3,3]
+           stores Cartesian coordinates of backbone N,Ca,C atoms
+    Returns
+    -------
+    xyz : numpy array of shape [batch,3,max nres,3]
+          as taken by xyz_to_c6d; NaN residues have no contacts
+    mask : numpy array of shape [batch,max nres]
+           True for the real residues of each structure
+    """
+
+    nres = max(len(x) for x in xyzs)
+    xyz = np.full((len(xyzs), nres, 3, 3), np.nan, dtype=np.float32)
+    mask = np.zeros((len(xyzs), nres), dtype=bool)
+    for k, x in enumerate(xyzs):
+        xyz[k,:len(x)] = x
+        mask[k,:len(x)] = True
+    return xyz.transpose(0,2,1,3), mask
+
+
+# ============================================================
+def xyz_to_c6d_batch(xyzs, params):
+    """distance and orientation features of the residue pairs in
+    contact for several structures, computed by one padded xyz_to_c6d
+
+    Parameters
+    ----------
+    xyzs : list of numpy arrays of shape [nres,3,3]
+           stores Cartesian coordinates of backbone N,Ca,C atoms
+    Returns
+    -------
+    pairs : list of (i,j,c6d) numpy arrays for each structure, with the
+            pairs i < j in contact in the order of xyz_to_c6d's maps
+    """
+
+    xyz, mask = pad_xyz(xyzs)
+    c6d = xyz_to_c6d(xyz, params)
+    valid = mask[:,:,None] & mask[:,None,:] & (c6d[...,0] < 999)
+    # b,i,j sorted by structure, then row, then column
+    b,i,j = np.nonzero(np.triu(valid, k=1))
+    c6d = c6d[b,i,j]
+    bounds = np.searchsorted(b, np.arange(len(xyzs) + 1))
+    return [(i[lo:hi], j[lo:hi], c6d[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+# ============================================================
+def get_cb(N,Ca,C):
+    """recreate Cb given N,Ca,C"""
+    b = Ca - N
+    c = C - Ca
+    a = np.cross(b, c)
+    Cb = -0.58273431*a + 0.56802827*b - 0.54067466*c + Ca
+    return Cb
@@ -1,5 +1,6 @@
 # code modified from https://github.com/RosettaCommons/RFDesign/tree/main/hallucination/util/parsers.py
 
+import gzip
 import numpy as np
 import Parser.Util.util as util
 
@@ -9,68 +10,83 @@ to1letter = {
     "LEU":'L', "LYS":'K', "MET":'M', "PHE":'F', "PRO":'P',
     "SER":'S', "THR":'T', "TRP":'W', "TYR":'Y', "VAL":'V' }
 
-def parse_pdb(filename, **kwargs):
-    '''extract xyz coords for all heavy atoms'''
-    lines = open(filename,'r').readlines()
-    return parse_pdb_lines(lines, **kwargs)
-
-def parse_pdb_lines(lines):
-    try:
-        # indices of residues observed in the structure
-        ssbond_lines = [(l) for l in lines if (l[:6]=="SSBOND")]
-        for ln in range(len(lines)):
-            if (lines[ln])[:6] == "ENDMDL":
-                lines = lines[:ln]
-                break
-                
-#         if l[:4]=="ATOM"):
-#             #
-#             atom_line = l.split(" ")
-#             atom_line = [
-        res = [(l[22:26],l[17:20]) for l in lines if l[:4]=="ATOM" and l[12:16].strip()=="CA"]
-        
-        
-        seq = [util.aa2num[r[1]] if r[1] in util.aa2num.keys() else 20 for r in res]
-        pdb_idx = [( l[21:22].strip(), int(l[22:26].strip()) ) for l in lines if l[:4]=="ATOM" and l[12:16].strip()=="CA"]  # chain letter, res num
+# atom name -> position in the 14 atom representation, for each residue type
+aa2atom = {
+    aa: {atm.strip(): i for i, atm in enumerate(util.aa2long[n]) if atm is not None}
+    for aa, n in util.aa2num.items()
+}
 
-        # 4 BB + up to 10 SC atoms
-        xyz = np.full((len(res), 14, 3), np.nan, dtype=np.float32)
-        for l in lines:
-            if l[:4] != "ATOM":
-                continue
-            chain, resNo, atom, aa = l[21:22], int(l[22:26]), ' '+l[12:16].strip().ljust(3), l[17:20]
-            idx = pdb_idx.index((chain,resNo))
-            for i_atm, tgtatm in enumerate(util.aa2long[util.aa2num[aa]]):
-                if tgtatm is not None and tgtatm.strip() == atom.strip(): # ignore whitespace
-                    xyz[idx,i_atm,:] = [float(l[30:38]), float(l[38:46]), float(l[46:54])]
-                    break
+def parse_pdb(filename, **kwargs):
+    '''extract xyz coords for all heavy atoms, decompressing .gz files as they are read'''
+    if filename.endswith(".gz"):
+        f = gzip.open(filename,'rt')
+    else:
+        f = open(filename,'r')
+    with f:
+        return parse_pdb_lines(f, **kwargs)
 
-        # remove duplicated (chain, resi)
-        new_idx = []
-        i_unique = []
-        new_res = []
-        for i,idx in enumerate(pdb_idx):
-            if idx not in new_idx:
-                new_idx.append(idx)
-                new_res.append(res[i])
-                i_unique.append(i)
-        pdb_idx = new_idx
-        res = new_res
-        xyz = xyz[i_unique]
-        seq = np.array(seq)[i_unique]
+def scan_pdb_records(lines):
+    '''yield (record, line) for the SSBOND and ATOM records of the first model,
+    stopping at the first ENDMDL so later models are never read'''
+    for l in lines:
+        if l[:4] == "ATOM":
+            yield ("ATOM", l)
+        elif l[:6] == "SSBOND":
+            yield ("SSBOND", l)
+        elif l[:6] == "ENDMDL":
+            return
 
-        # parse SSBOND information
-        # (serial number, chain a, sequence number a, chain b, sequence number b, bond distance)
+def parse_pdb_lines(lines, residues=None, atoms=None):
+    '''residues, a set of residue names, keeps only residues of those types, and atoms,
+    a set of atom names, fills only those atoms, leaving the rest NaN; the coordinates
+    of everything else are never converted; every ATOM record still needs a known residue name'''
+    try:
+        # residues in order of their first CA record, keyed by (chain, resi)
+        # atoms are filled as they stream past; duplicated (chain, resi) share one slot
+        # slots of residues that are not kept have no row, and a CA index of -1 once seen
+        slots = {}
+        xyz = []
+        res = []
+        pdb_idx = []
         ssbond = []
-        for i in range(len(ssbond_lines)):
-            chain_a = ssbond_lines[i][14:16].strip()
-            seq_num_a = int(ssbond_lines[i][17:21])
-            chain_b = ssbond_lines[i][28:30].strip()
-            seq_num_b = int(ssbond_lines[i][30:35])
-            #distance = float(ssbond_lines[i][72:])
-            #tuple = (chain_a, seq_num_a, chain_b, seq_num_b, distance)
-            tuple = (chain_a, seq_num_a, chain_b, seq_num_b)
-            ssbond.append(tuple)
+        for record, l in scan_pdb_records(lines):
+            if record == "ATOM":
+                chain, resNo, atom, aa = l[21:22].strip(), int(l[22:26]), l[12:16].strip(), l[17:20]
+                # an unknown residue name fails the structure, whether or not the residue is kept
+                aa_atoms = aa2atom[aa]
+                key = (chain, resNo) # chain letter, res num
+                slot = slots.get(key)
+                if slot is None:
+                    if residues is None or aa in residues:
+                        slot = slots[key] = [len(xyz), None]
+                        xyz.append(np.full((14, 3), np.nan, dtype=np.float32)) # 4 BB + up to 10 SC atoms
+                    else:
+                        slot = slots[key] = [None, None]
+                if atom == "CA" and slot[1] is None:
+                    if slot[0] is None:
+                        slot[1] = -1
+                    else:
+                        slot[1] = len(pdb_idx)
+                        pdb_idx.append(key)
+                        res.append((l[22:26],aa))
+                if slot[0] is None or (atoms is not None and atom not in atoms):
+                    continue
+                i_atm = aa_atoms.get(atom)
+                if i_atm is not None:
+                    xyz[slot[0]][i_atm,:] = [float(l[30:38]), float(l[38:46]), float(l[46:54])]
+            else:
+                # parse SSBOND information
+                # (chain a, sequence number a, chain b, sequence number b)
+                ssbond.append((l[14:16].strip(), int(l[17:21]), l[28:30].strip(), int(l[30:35])))
+
+        # every residue needs a CA record, kept or not
+        order = [None] * len(pdb_idx)
+        for row, ca in slots.values():
+            if ca is None:
+                return []
+            if row is not None:
+                order[ca] = row
+        xyz = np.array([xyz[i] for i in order], dtype=np.float32).reshape(len(order), 14, 3)
 
         out = {'xyz':xyz, # cartesian coordinates [Lx14]
                 'idx':[i for i in pdb_idx], # residue numbers in the PDB file [L]
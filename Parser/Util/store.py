@@ -0,0 +1,150 @@
+# developed by Michael Reilly github.com/mreilly13
+
+import os
+import time
+import shutil
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# the store is a directory of .npy shards holding csv_type record arrays, plus an index
+# with one line per parsed PDB: name,shard,offset,count,parsed
+# later lines for the same name replace earlier ones, so a re-parsed PDB is simply appended
+index_name = "index.csv"
+shard_prefix = "part-"
+shard_ext = ".npy"
+
+class ShardWriter:
+    # buffer parsed pair tables and write them to the store in shards of about rows_per_shard rows;
+    # on_flush is called with the (name, shard, offset, count, parsed) entries of each written shard
+    def __init__(self, directory, rows_per_shard=1000000, on_flush=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.rows_per_shard = rows_per_shard
+        self.on_flush = on_flush
+        self.shard = next_shard(directory)
+        self.buffer = []
+        self.entries = []
+        self.rows = 0
+
+    def append(self, name, data, parsed=None):
+        data = np.atleast_1d(np.array(data))
+        self.buffer.append(data)
+        self.entries.append((name, len(data), time.time() if parsed is None else parsed))
+        self.rows += len(data)
+        if self.rows >= self.rows_per_shard:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        shard = shard_name(self.shard)
+        shard_path = os.path.join(self.directory, shard)
+        with open(shard_path + ".tmp", "wb") as f:
+            np.save(f, np.concatenate(self.buffer))
+        os.replace(shard_path + ".tmp", shard_path)
+        written = []
+        offset = 0
+        for name, count, parsed in self.entries:
+            written.append((name, shard, offset, count, parsed))
+            offset += count
+        with open(os.path.join(self.directory, index_name), "a") as f:
+            for entry in written:
+                f.write(",".join(str(field) for field in entry) + "\n")
+        if self.on_flush:
+            self.on_flush(written)
+        self.shard += 1
+        self.buffer = []
+        self.entries = []
+        self.rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+def shard_name(number):
+    return f"{shard_prefix}{number:05d}{shard_ext}"
+
+def next_shard(directory):
+    # number of the first unused shard in the directory
+    numbers = [int(f[len(shard_prefix):-len(shard_ext)]) for f in os.listdir(directory) if f.startswith(shard_prefix) and f.endswith(shard_ext)]
+    return max(numbers, default=-1) + 1
+
+def read_index(directory):
+    # name -> (shard, offset, count, parsed) for the latest entry of every PDB in the store
+    index = {}
+    index_path = os.path.join(directory, index_name)
+    if not os.path.exists(index_path):
+        return index
+    with open(index_path) as f:
+        for line in f:
+            name, shard, offset, count, parsed = line.rstrip('\n').split(',')
+            index[name] = (shard, int(offset), int(count), float(parsed))
+    return index
+
+def merge_store(source, directory):
+    # add the current entries of the store in source to the store in directory, linking or
+    # copying the shards they are in under new numbers; returns old shard name -> new shard name
+    index = read_index(source)
+    os.makedirs(directory, exist_ok=True)
+    number = next_shard(directory)
+    renamed = {}
+    for shard in sorted(set(entry[0] for entry in index.values())):
+        renamed[shard] = shard_name(number)
+        number += 1
+        src = os.path.join(source, shard)
+        dst = os.path.join(directory, renamed[shard])
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+    with open(os.path.join(directory, index_name), "a") as f:
+        for name, (shard, offset, count, parsed) in index.items():
+            f.write(f"{name},{renamed[shard]},{offset},{count},{parsed}\n")
+    return renamed
+
+def load_store(directory, jobs=1):
+    # fill one preallocated record array with the current rows of every PDB in the store,
+    # copying up to jobs shards at a time
+    slices = {}
+    for shard, offset, count, parsed in read_index(directory).values():
+        slices.setdefault(shard, []).append((offset, count))
+    shards = sorted(slices)
+    if shards == []:
+        from Parser.parsePDB import csv_type
+        return np.zeros(0, dtype=csv_type)
+    starts = np.cumsum([0] + [sum(count for offset, count in slices[shard]) for shard in shards])
+    dtype = np.load(os.path.join(directory, shards[0]), mmap_mode='r').dtype
+    data = np.empty(starts[-1], dtype=dtype)
+
+    def fill(shard, start):
+        src = np.load(os.path.join(directory, shard), mmap_mode='r')
+        for offset, count in sorted(slices[shard]):
+            data[start:start + count] = src[offset:offset + count]
+            start += count
+
+    with ThreadPoolExecutor(jobs) as pool:
+        list(pool.map(fill, shards, starts[:-1]))
+    return data
+
+def read_csv(path):
+    # read one per-PDB .csv file from older versions as a record array
+    from Parser.parsePDB import csv_type
+    return np.atleast_1d(np.genfromtxt(path, delimiter=',', dtype=csv_type, encoding=None))
+
+def convert_csv_dir(csv_dir, directory, rows_per_shard=1000000, jobs=1):
+    # copy a directory of per-PDB .csv files from older versions into the store,
+    # reading them in up to jobs processes
+    files = [f for f in sorted(os.listdir(csv_dir)) if f.endswith(".csv")]
+    paths = [os.path.join(csv_dir, f) for f in files]
+    pool = ProcessPoolExecutor(jobs) if jobs > 1 else None
+    try:
+        tables = pool.map(read_csv, paths, chunksize=64) if pool else map(read_csv, paths)
+        with ShardWriter(directory, rows_per_shard) as writer:
+            for f, path, data in zip(files, paths, tables):
+                writer.append(f[:-len(".csv")], data, os.path.getmtime(path))
+    finally:
+        if pool:
+            pool.shutdown()
+    return len(files)
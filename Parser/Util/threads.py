@@ -0,0 +1,47 @@
+# developed by Michael Reilly github.com/mreilly13
+
+import os
+import sys
+
+# BLAS, OpenMP, torch and TensorFlow each start a pool of one thread per core by default,
+# so N worker processes run N x cores threads; set_threads gives every library in a process
+# the same budget. Environment variables cover libraries loaded afterwards, including in
+# workers started later, and the runtime calls cover those already loaded
+thread_vars = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "TF_NUM_INTRAOP_THREADS",
+    "TF_NUM_INTEROP_THREADS",
+]
+
+def per_worker(workers):
+    # even share of the cores for each of workers processes
+    return max(1, (os.cpu_count() or 1) // workers)
+
+def set_threads(threads):
+    # limit the threads of BLAS, torch and TensorFlow in this process; None leaves the defaults
+    if not threads:
+        return
+    for var in thread_vars:
+        os.environ[var] = str(threads)
+    try:
+        # resizes BLAS and OpenMP pools that are already loaded, e.g. in forked workers
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(threads)
+    except ImportError:
+        pass
+    if "torch" in sys.modules:
+        torch = sys.modules["torch"]
+        torch.set_num_threads(threads)
+    if "tensorflow" in sys.modules:
+        tf = sys.modules["tensorflow"]
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(threads)
+            tf.config.threading.set_inter_op_parallelism_threads(threads)
+        except RuntimeError:
+            # TensorFlow fixes its pools when it first runs; the environment variables
+            # applied if it was imported after they were set
+            pass
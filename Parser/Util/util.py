@@ -1,7 +1,6 @@
 # code modified from https://github.com/RosettaCommons/RFDesign/tree/main/hallucination/util/util.py
 
 import numpy as np
-import torch
 
 
 num2aa=[
@@ -244,6 +243,7 @@ for i in range(20):
             long2alt[i,j] = i_lalt.index(a)
 
 def atoms_from_frames(base,parent,gparent,points):
+    import torch
     xs = parent-base
     xs = xs / torch.norm(xs, dim=-1)[:,None]
     ys = gparent-base
@@ -256,6 +256,7 @@ def atoms_from_frames(base,parent,gparent,points):
 
 # writepdb
 def writepdb(filename, atoms, bfacts, seq):
+    import torch
     f = open(filename,"w")
 
     ctr = 1
@@ -1,9 +1,10 @@
 # developed by Michael Reilly github.com/mreilly13
 
+import importlib
 import numpy as np
-import torch
 import Parser.Util.parser as parser
-import Parser.Util.geometry as geometry
+import Parser.Util.npgeometry as geometry
+from Parser.Util.threads import set_threads
 
 # numpy values needed for .csv input/output
 csv_type = [
@@ -19,47 +20,161 @@ csv_type = [
 ]
 csv_format = ['%f','%f','%f','%f','%d','%s','%d','%s','%d']
 
-def parse(filename, test=False):
+# geometry parameters, and the residue count above which pairs are found by neighbour search
+params = {'DMAX':20.0}
+sparse_nres = 2000
+
+# training only needs the backbone and sulfur of the cysteines, so the parser skips the rest
+train_residues = {"CYS"}
+train_atoms = {"N", "CA", "C", "SG"}
+
+# parse_many computes the geometry of structures of up to batch_nres residues together,
+# in padded batches of at most batch_maps residue pairs
+batch_nres = 256
+batch_maps = 2**22
+
+# modules computing the pair geometry; Benchmarks.geometryCompare checks that they find the
+# same pairs with features within its tolerance, though rounding can put a pair at almost
+# exactly DMAX on either side
+geometries = {'numpy': "Parser.Util.npgeometry", 'torch': "Parser.Util.geometry"}
+geometry_name = "numpy"
+
+def set_geometry(name):
+    # compute the pair geometry with the numpy or torch module, numpy by default;
+    # pools pass the choice to their workers with init_worker
+    global geometry, geometry_name
+    geometry = importlib.import_module(geometries[name])
+    geometry_name = name
+
+def init_worker(threads=None, name="numpy"):
+    # initializer of parse worker processes, setting their thread budget and the geometry
+    # module chosen in the parent however the workers are started
+    set_threads(threads)
+    set_geometry(name)
+
+def parse(filename, test=False, mem_budget=None):
     # parse a PDB file, extracting cysteine information
-    pdb = parser.parse_pdb(filename)
+    # mem_budget, in bytes, computes the dense maps in tiles that fit the budget
+    return parse_structure(parser.parse_pdb(filename, **selection(test)), test, mem_budget)
+
+def parse_string(contents, test=False, mem_budget=None):
+    # parse the contents of a PDB file, extracting cysteine information
+    return parse_structure(parser.parse_pdb_lines(contents.splitlines(True), **selection(test)), test, mem_budget)
+
+def parse_many(filenames, test=False, mem_budget=None):
+    # parse several PDB files, returning the result of parse for each; the pair geometry
+    # of small structures is computed in padded batches, amortising the per call overhead,
+    # and a file that cannot be read or computed fails alone, with the error as its data;
+    # running out of memory is not a fault of the file and is raised
+    results = [None] * len(filenames)
+    small = []
+    for k, filename in enumerate(filenames):
+        try:
+            pdb = parser.parse_pdb(filename, **selection(test))
+            errc, xyz, idx, ssbond = select_residues(pdb, test)
+            if errc != 0:
+                results[k] = (errc, [])
+            elif len(idx) <= batch_nres and not mem_budget:
+                small.append((k, xyz, idx, ssbond))
+            else:
+                results[k] = pair_geometry(xyz, idx, ssbond, mem_budget)
+        except MemoryError:
+            raise
+        except Exception as e:
+            results[k] = (1, repr(e))
+    for (k, xyz, idx, ssbond), batch_result in zip(small, pair_geometry_batch([entry[1:] for entry in small])):
+        results[k] = batch_result
+    return results
+
+def pair_geometry_batch(structures):
+    # parse results for a list of (xyz, idx, ssbond) of selected residues, computing the
+    # geometry of similar sizes together in padded batches so little of each is padding;
+    # a batch that fails is computed again one structure at a time, so only the bad one fails
+    results = [None] * len(structures)
+    order = sorted(range(len(structures)), key=lambda k: len(structures[k][1]))
+    while order:
+        count = 1
+        while count < len(order) and (count + 1) * len(structures[order[count]][1])**2 <= batch_maps:
+            count += 1
+        batch, order = order[:count], order[count:]
+        try:
+            pairs = geometry.xyz_to_c6d_batch([structures[k][0][:,:3,:] for k in batch], params)
+            for k, (i, j, c6d) in zip(batch, pairs):
+                xyz, idx, ssbond = structures[k]
+                results[k] = result(pair_records(c6d, i, j, idx, ssbond))
+        except Exception:
+            for k in batch:
+                try:
+                    results[k] = pair_geometry(*structures[k])
+                except MemoryError:
+                    raise
+                except Exception as e:
+                    results[k] = (1, repr(e))
+    return results
+
+def selection(test=False):
+    # parse_pdb arguments reading only what parse_structure uses
+    if test:
+        return {}
+    return {'residues': train_residues, 'atoms': train_atoms}
+
+def parse_structure(pdb, test=False, mem_budget=None):
+    # extract cysteine pair information from the output of parse_pdb
+    errc, xyz, idx, ssbond = select_residues(pdb, test)
+    if errc != 0:
+        return (errc, [])
+    return pair_geometry(xyz, idx, ssbond, mem_budget)
+
+def select_residues(pdb, test=False):
+    # (errc, xyz, idx, ssbond) of the cysteines of the output of parse_pdb, or all residues for test
     if pdb == []:
-        return (1 , [])
+        return (1, None, None, None)
     ssbond = pdb['ssbond']
     if not test and ssbond == []:
-        return (2, [])
-    xyz = []
-    idx = []
-    res = []
-    for i in range(pdb['xyz'].shape[0]):
-        if test or pdb['res'][i].endswith("CYS"):
-            xyz.append(pdb['xyz'][i])
-            idx.append(pdb['idx'][i])
-            res.append(pdb['res'][i])
-    if xyz == []:
-        return (2, [])
-    xyz = np.array(xyz)
-    xyz_ref = torch.tensor(xyz[:,:3,:]).float()
-    c6d_ref = geometry.xyz_to_c6d(xyz_ref[None].permute(0,2,1,3),{'DMAX':20.0}).numpy()
-    c6d = []
-    i = 0
-    for row in c6d_ref[0]:
-        j = 0
-        for col in row:
-            if j > i and col[0] < 999:
-                val = [n for n in col]
-                if (idx[i][0], idx[i][1], idx[j][0], idx[j][1]) in ssbond:
-                    val.append(1)
-                else:
-                    val.append(0)
-                val.append(idx[i][0])
-                val.append(idx[i][1])
-                val.append(idx[j][0])
-                val.append(idx[j][1])
-                structd = np.array(tuple(val), dtype=csv_type)
-                c6d.append(structd)
-            j += 1
-        i += 1
-    if c6d == []:
+        return (2, None, None, None)
+    keep = [i for i in range(pdb['xyz'].shape[0]) if test or pdb['res'][i].endswith("CYS")]
+    if keep == []:
+        return (2, None, None, None)
+    return (0, pdb['xyz'][keep], [pdb['idx'][i] for i in keep], ssbond)
+
+def pair_geometry(xyz, idx, ssbond, mem_budget=None):
+    # parse result for the selected residues of one structure
+    xyz_ref, mask = geometry.pad_xyz([xyz[:,:3,:]])
+    if mem_budget:
+        b, i, j, c6d = geometry.xyz_to_c6d_tiled(xyz_ref, params, mem_budget)
+        i, j, c6d = np.asarray(i), np.asarray(j), np.asarray(c6d)
+    elif len(idx) > sparse_nres:
+        # neighbour search instead of the dense nres x nres maps
+        b, i, j, c6d = geometry.xyz_to_c6d_sparse(xyz_ref, params)
+        i, j, c6d = np.asarray(i), np.asarray(j), np.asarray(c6d)
+    else:
+        c6d = np.asarray(geometry.xyz_to_c6d(xyz_ref, params))[0]
+        i, j = np.triu_indices(len(idx), k=1)
+        contact = c6d[i,j,0] < 999
+        i, j = i[contact], j[contact]
+        c6d = c6d[i,j]
+    return result(pair_records(c6d, i, j, idx, ssbond))
+
+def result(data):
+    if len(data) == 0:
         return (2, [])
     else:
-        return (0, c6d)
+        return (0, data)
+
+def pair_records(c6d, i, j, idx, ssbond):
+    # fill a csv_type table for the residue pairs (i, j) with their c6d features,
+    # labelling the pairs listed in the SSBOND records
+    data = np.zeros(len(i), dtype=csv_type)
+    for n, field in enumerate(('dist', 'omega', 'theta', 'phi')):
+        data[field] = c6d[:,n]
+    chains = np.array([c for c, r in idx], dtype=(np.str_,1))
+    resis = np.array([r for c, r in idx], dtype=np.int32)
+    data['chain1'] = chains[i]
+    data['res1'] = resis[i]
+    data['chain2'] = chains[j]
+    data['res2'] = resis[j]
+    # join on (i, j) residue positions, in the order the SSBOND record lists them
+    position = {r: n for n, r in enumerate(idx)}
+    bonds = [position[(ca, ra)] * len(idx) + position[(cb, rb)] for ca, ra, cb, rb in set(ssbond) if (ca, ra) in position and (cb, rb) in position]
+    data['ssbond'] = np.isin(i * len(idx) + j, bonds)
+    return data